@@ -1,52 +1,65 @@
-from flask import Flask, request, make_response
+import logging
+
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_mail import Mail
+# Imported ahead of the extensions so its atexit flush runs after their shutdown hooks
+from . import log
+from .email_queue import EmailQueue
+from .mail_pool import SMTPPool
+from .email_templates import EmailTemplates
+from .ratelimit import RateLimiter
+from .json_provider import FastJSONProvider
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 mail = Mail()
+email_queue = EmailQueue()
+smtp_pool = SMTPPool()
+email_templates = EmailTemplates()
+rate_limiter = RateLimiter()
+
+logger = logging.getLogger(__name__)
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object('app.config.Config')
+    if test_config:
+        app.config.update(test_config)
     
+    from . import metrics, query_stats
+    log.init_app(app)
+    metrics.init_app(app)
+    query_stats.init_app(app)
+
     # Configure session for production
     app.config['SESSION_COOKIE_SECURE'] = True
     app.config['SESSION_COOKIE_HTTPONLY'] = True
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # Changed from 'None' to 'Lax' for better cross-origin support
     # Let Flask handle domain automatically
     
-    # Custom CORS handler to ensure credentials are properly handled
-    @app.after_request
-    def after_request(response):
-        origin = request.headers.get('Origin')
-        print(f"Request origin: {origin}")  # Debug print
-        
-        # Allow origins for both development and production
-        allowed_origins = [
-            'http://localhost:5173', 
-            'http://127.0.0.1:5173',
-            'https://cafe-fausse-z85a.onrender.com',  # Your Render frontend URL
-            'https://cafe-fausse-frontend.onrender.com',
-            'https://cafe-fausse.onrender.com'
-        ]
-        
-        if origin in allowed_origins:
-            response.headers['Access-Control-Allow-Origin'] = origin
-            response.headers['Access-Control-Allow-Credentials'] = 'true'
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-            print(f"Set CORS headers: {dict(response.headers)}")  # Debug print
-        return response
-    
+    from . import db_pool
+    db_pool.configure(app)
     db.init_app(app)
     migrate.init_app(app, db)
     mail.init_app(app)
+    smtp_pool.init_app(app)
+    email_templates.init_app(app)
+    rate_limiter.init_app(app)
+
+    from . import compression, cors
+    compression.init_app(app)
+    cors.init_app(app)
 
     # Import models to register them with SQLAlchemy
     from . import models
+    from . import occupancy, landing
+    occupancy.init_app(app)
+    landing.init_app(app)
+    email_queue.init_app(app)
 
     # Register blueprints (routes)
     from .auth import admin_auth_bp
@@ -55,14 +68,10 @@ def create_app():
     from .routes.gallery import gallery_bp
     from .routes.about import about_bp
     
-    print("Loading newsletter blueprint...")
     try:
         from .routes.newsletter import newsletter_bp
-        print("✅ Newsletter blueprint loaded successfully")
-    except Exception as e:
-        print(f"❌ Failed to load newsletter blueprint: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception('Failed to load newsletter blueprint')
     
     from .routes.email import email_bp
 
@@ -74,12 +83,13 @@ def create_app():
     
     try:
         app.register_blueprint(newsletter_bp, url_prefix='/api/newsletter')
-        print("✅ Newsletter blueprint registered successfully")
-    except Exception as e:
-        print(f"❌ Failed to register newsletter blueprint: {e}")
+    except Exception:
+        logger.exception('Failed to register newsletter blueprint')
     
     app.register_blueprint(email_bp)
 
+    db_pool.warm_up(app)
+
     @app.route('/api/health')
     def health():
         return {'status': 'ok'}, 200
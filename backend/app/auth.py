@@ -1,13 +1,49 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
 from werkzeug.security import check_password_hash, generate_password_hash
+from app.cache import TTLCache
+from app.db_pool import pool_status
 from app.models import Admin
-from app import db
+from app import db, rate_limiter
 import os
+import secrets
 
 admin_auth_bp = Blueprint('admin_auth', __name__)
 
-# Simple in-memory token storage (in production, use Redis or database)
-admin_tokens = {}
+# Tokens revoked by logout, kept until they would have expired anyway. This
+# is per worker: a logged-out token stays valid on other workers until expiry.
+revoked_tokens = TTLCache(maxsize=10000, ttl=12 * 60 * 60)
+
+@admin_auth_bp.record
+def configure_tokens(state):
+    revoked_tokens.ttl = state.app.config.get('ADMIN_TOKEN_MAX_AGE', revoked_tokens.ttl)
+
+def token_serializer():
+    serializer = current_app.extensions.get('admin_token_serializer')
+    if serializer is None:
+        serializer = URLSafeTimedSerializer(current_app.secret_key, salt='admin-token')
+        current_app.extensions['admin_token_serializer'] = serializer
+    return serializer
+
+def issue_admin_token(admin_id):
+    """Sign a token carrying the admin id; any worker sharing SECRET_KEY can verify it"""
+    return token_serializer().dumps({'admin_id': admin_id, 'jti': secrets.token_urlsafe(8)})
+
+def verify_admin_token(token):
+    """Return the admin id for a valid, unexpired, unrevoked token, else None"""
+    try:
+        data = token_serializer().loads(token, max_age=current_app.config.get('ADMIN_TOKEN_MAX_AGE', 12 * 60 * 60))
+    except BadSignature:
+        return None
+    if revoked_tokens.get(data.get('jti')):
+        return None
+    return data.get('admin_id')
+
+def bearer_token():
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
 
 def require_admin(f):
     """Decorator to require admin authentication"""
@@ -17,17 +53,16 @@ def require_admin(f):
             return f(*args, **kwargs)
         
         # Check for token in headers
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            if token in admin_tokens:
-                return f(*args, **kwargs)
+        token = bearer_token()
+        if token and verify_admin_token(token):
+            return f(*args, **kwargs)
         
         return jsonify({'error': 'Admin login required.'}), 401
     decorated_function.__name__ = f.__name__
     return decorated_function
 
 @admin_auth_bp.route('/api/admin/login', methods=['POST'])
+@rate_limiter.limit('RATELIMIT_LOGIN')
 def admin_login():
     """Admin login endpoint"""
     try:
@@ -46,9 +81,7 @@ def admin_login():
             session['admin_id'] = admin.id
             
             # Generate token for API access
-            import secrets
-            token = secrets.token_urlsafe(32)
-            admin_tokens[token] = admin.id
+            token = issue_admin_token(admin.id)
             
             return jsonify({
                 'message': 'Login successful.',
@@ -68,11 +101,14 @@ def admin_logout():
         # Clear session
         session.pop('admin_id', None)
         
-        # Clear token if provided
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            admin_tokens.pop(token, None)
+        # Revoke token if provided
+        token = bearer_token()
+        if token:
+            try:
+                data = token_serializer().loads(token)
+                revoked_tokens.set(data.get('jti'), True)
+            except BadSignature:
+                pass
         
         return jsonify({'message': 'Logout successful.'}), 200
     except Exception as e:
@@ -87,16 +123,21 @@ def admin_status():
             return jsonify({'logged_in': True, 'admin_id': session['admin_id']}), 200
         
         # Check token
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            if token in admin_tokens:
-                return jsonify({'logged_in': True, 'admin_id': admin_tokens[token]}), 200
+        token = bearer_token()
+        admin_id = verify_admin_token(token) if token else None
+        if admin_id:
+            return jsonify({'logged_in': True, 'admin_id': admin_id}), 200
         
         return jsonify({'logged_in': False}), 200
     except Exception as e:
         return jsonify({'error': f'Status check failed: {str(e)}'}), 500
 
+@admin_auth_bp.route('/api/admin/db-pool', methods=['GET'])
+@require_admin
+def db_pool_metrics():
+    """Connection pool occupancy and checkout wait times for this worker"""
+    return jsonify(pool_status()), 200
+
 @admin_auth_bp.route('/api/admin/create', methods=['POST'])
 def create_admin():
     """Create admin user endpoint"""
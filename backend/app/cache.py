@@ -0,0 +1,143 @@
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import Response, current_app, request
+
+from app import compression
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    The cache is local to one worker process, so the TTL bounds how long a
+    write made by another worker can go unnoticed. Readers that fill the cache
+    from the database should take a ``stamp(key)`` before querying and pass it
+    to ``set()``: if the key was invalidated in the meantime the stale value
+    is dropped instead of being cached.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._generations = OrderedDict()
+        self._ticks = itertools.count(1)
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def stamp(self, key):
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, stamp=None):
+        with self._lock:
+            if stamp is not None and stamp != (self._epoch, self._generations.get(key, 0)):
+                return
+            self._store(key, value)
+
+    def update(self, key, func):
+        """Atomically replace a cached value with ``func(value)`` if present.
+
+        Like ``pop()`` this invalidates stamps taken before the call, so a
+        concurrent reader cannot overwrite the updated value with stale data.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                self._data[key] = (func(entry[0]), entry[1])
+            self._bump(key)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._bump(key)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+    def _bump(self, key):
+        self._generations[key] = next(self._ticks)
+        self._generations.move_to_end(key)
+        while len(self._generations) > self.maxsize * 4:
+            self._generations.popitem(last=False)
+
+    def _store(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CachedPayload(namedtuple('CachedPayload', 'body etag variants')):
+    """A JSON document serialized once, with a strong ETag over its bytes.
+
+    Compressed variants are built on first request for each encoding and
+    kept with the payload, so cache hits don't compress again.
+    """
+
+    @classmethod
+    def from_data(cls, data):
+        body = current_app.json.dumps_bytes(data)
+        return cls(body, hashlib.sha256(body).hexdigest()[:32], {})
+
+    def encoded(self, encoding):
+        if not encoding:
+            return self.body
+        data = self.variants.get(encoding)
+        if data is None:
+            data = self.variants[encoding] = compression.compress(self.body, encoding)
+        return data
+
+
+def cached_payload(cache, key, build):
+    """Return the cached payload for ``key``, calling ``build()`` for the data on a miss"""
+    payload = cache.get(key)
+    if payload is None:
+        stamp = cache.stamp(key)
+        payload = CachedPayload.from_data(build())
+        cache.set(key, payload, stamp)
+    return payload
+
+
+def payload_response(payload, max_age=0):
+    """Serve a cached payload, answering a matching If-None-Match with 304.
+
+    With ``max_age=0`` browsers revalidate on every load, which costs a 304
+    from the cache, so admin edits show up immediately.
+    """
+    encoding = compression.negotiate(len(payload.body))
+    response = Response(payload.encoded(encoding), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f'{payload.etag}-{encoding}')
+    else:
+        response.set_etag(payload.etag)
+    response.cache_control.public = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -0,0 +1,273 @@
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db, email_queue, smtp_pool
+from app.mail_pool import MESSAGE_ERRORS
+from app.models import CampaignDelivery, Newsletter, NewsletterCampaign
+
+logger = logging.getLogger(__name__)
+
+
+def campaign_progress(campaign_id):
+    """Count deliveries by status for a campaign"""
+    rows = db.session.execute(
+        select(CampaignDelivery.status, func.count())
+        .where(CampaignDelivery.campaign_id == campaign_id)
+        .group_by(CampaignDelivery.status)
+    )
+    counts = dict(rows.all())
+    return {'sent': counts.get('sent', 0), 'failed': counts.get('failed', 0)}
+
+
+def start_campaign(campaign_id):
+    """Send (or resume) a campaign in the background"""
+    email_queue.enqueue('newsletter_campaign', campaign_id)
+
+
+class SendThrottle:
+    """Paces outgoing campaign messages to at most ``rate`` per second (0 disables pacing)"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(self.next_at, now) + self.interval
+
+
+class CampaignLease:
+    """A run's hold on its campaign and on the email-queue job running it.
+
+    The campaign row is held until ``lease_until`` and the run renews it
+    every third of ``NEWSLETTER_LEASE``, so another run can only take over
+    from one that stopped renewing. The job's own lease is renewed through
+    the email queue, so a database worker doesn't claim the job again while
+    the campaign is still being sent.
+    """
+
+    def __init__(self, campaign_id, run_id, seconds):
+        self.campaign_id = campaign_id
+        self.run_id = run_id
+        self.seconds = seconds
+        self.renewed_at = time.monotonic()
+
+    def until(self):
+        return datetime.now() + timedelta(seconds=self.seconds)
+
+    def keep(self):
+        """Renew the lease if it is due; False once this run no longer holds the campaign or job"""
+        if not email_queue.renew_lease():
+            return False
+        if time.monotonic() - self.renewed_at < self.seconds / 3:
+            return True
+        renewed = db.session.execute(
+            update(NewsletterCampaign)
+            .where(NewsletterCampaign.id == self.campaign_id, NewsletterCampaign.run_id == self.run_id)
+            .values(lease_until=self.until())
+        ).rowcount
+        db.session.commit()
+        self.renewed_at = time.monotonic()
+        return renewed == 1
+
+
+class ChunkStopped(Exception):
+    """Sending stopped part way through a chunk.
+
+    ``deliveries`` holds the recipients handled before it stopped; the rest
+    of the chunk was not attempted.
+    """
+
+    reason = 'Sending stopped'
+
+    def __init__(self, deliveries):
+        super().__init__(f'{self.reason} after {len(deliveries)} recipients')
+        self.deliveries = deliveries
+
+
+class ChunkInterrupted(ChunkStopped):
+    """The SMTP connection failed part way through a chunk"""
+
+    reason = 'SMTP connection failed'
+
+
+class LeaseLost(ChunkStopped):
+    """Another run may have taken over, so this one stopped sending"""
+
+    reason = 'Lease lost'
+
+
+def send_chunk(campaign, subscribers, throttle, lease):
+    """Send one chunk of subscribers over a single pooled SMTP session.
+
+    A message the server rejects is recorded as 'failed'. Losing the
+    connection is not the recipient's fault, so it raises ChunkInterrupted
+    instead and the remaining recipients are left for a later run. The
+    lease is checked before every message, and LeaseLost is raised as soon
+    as another run may have taken over.
+    """
+    deliveries = []
+    # Read once: renewing the lease commits the session, which expires the campaign
+    subject, body_text, body_html = campaign.subject, campaign.body_text, campaign.body_html
+    try:
+        with smtp_pool.connection() as send:
+            for newsletter_id, email in subscribers:
+                throttle.wait()
+                if not lease.keep():
+                    raise LeaseLost(deliveries)
+                msg = Message(
+                    subject=subject,
+                    recipients=[email],
+                    body=body_text,
+                    html=body_html
+                )
+                try:
+                    send(msg)
+                    status, error = 'sent', None
+                except MESSAGE_ERRORS as e:
+                    status, error = 'failed', str(e)[:255]
+                deliveries.append({
+                    'campaign_id': campaign.id,
+                    'newsletter_id': newsletter_id,
+                    'email': email,
+                    'status': status,
+                    'error': error,
+                    'sent_at': datetime.now()
+                })
+    except LeaseLost:
+        raise
+    except Exception as e:
+        raise ChunkInterrupted(deliveries) from e
+    return deliveries
+
+
+def record_deliveries(deliveries):
+    """Insert delivery rows, skipping recipients another run already recorded"""
+    try:
+        db.session.execute(insert(CampaignDelivery), deliveries)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        for delivery in deliveries:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(CampaignDelivery), [delivery])
+            except IntegrityError:
+                pass
+        db.session.commit()
+
+
+def last_recorded_id(campaign_id):
+    return db.session.scalar(
+        select(func.max(CampaignDelivery.newsletter_id)).where(CampaignDelivery.campaign_id == campaign_id)
+    ) or 0
+
+
+def owns_campaign(campaign_id, run_id):
+    return db.session.scalar(select(NewsletterCampaign.run_id).where(NewsletterCampaign.id == campaign_id)) == run_id
+
+
+@email_queue.task('newsletter_campaign')
+def run_campaign(campaign_id):
+    """Send a campaign to every subscriber, resuming after the last recorded one.
+
+    Subscribers are read in id order, ``NEWSLETTER_CHUNK_SIZE`` at a time,
+    and each chunk's deliveries are committed once it has been sent. If a
+    run dies mid-chunk, at most that chunk is sent again. If the SMTP
+    connection fails, what was sent is recorded, the campaign is marked
+    'interrupted' and the task returns False so the email queue retries it;
+    it can also be resumed by hand.
+
+    A run holds the campaign with a CampaignLease. While another run's
+    lease is live this one sends nothing and returns False, so the email
+    queue tries again later. A run that stopped renewing (it died or
+    stalled) can be taken over; it notices at its next lease check, records
+    what it sent and stops. If the old run recorded some of the current
+    chunk first, the new one skips those recipients and carries on from the
+    last recorded subscriber.
+    """
+    run_id = uuid.uuid4().hex
+    lease = CampaignLease(campaign_id, run_id, current_app.config.get('NEWSLETTER_LEASE', 300))
+    now = datetime.now()
+    claimed = db.session.execute(
+        update(NewsletterCampaign)
+        .where(
+            NewsletterCampaign.id == campaign_id,
+            NewsletterCampaign.status != 'completed',
+            or_(
+                NewsletterCampaign.status != 'sending',
+                NewsletterCampaign.lease_until.is_(None),
+                NewsletterCampaign.lease_until <= now
+            )
+        )
+        .values(status='sending', run_id=run_id, lease_until=lease.until(),
+                started_at=func.coalesce(NewsletterCampaign.started_at, now))
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        # Completed, or another run holds it; in that case check back later
+        status = db.session.scalar(select(NewsletterCampaign.status).where(NewsletterCampaign.id == campaign_id))
+        return status in (None, 'completed')
+
+    campaign = db.session.get(NewsletterCampaign, campaign_id)
+    chunk_size = current_app.config.get('NEWSLETTER_CHUNK_SIZE', 100)
+    throttle = SendThrottle(current_app.config.get('NEWSLETTER_RATE_LIMIT', 10))
+    last_id = last_recorded_id(campaign_id)
+
+    while True:
+        subscribers = db.session.execute(
+            select(Newsletter.id, Newsletter.email)
+            .where(Newsletter.id > last_id)
+            .order_by(Newsletter.id)
+            .limit(chunk_size)
+        ).all()
+        if not subscribers:
+            break
+        if not owns_campaign(campaign_id, run_id):
+            return True
+
+        try:
+            deliveries = send_chunk(campaign, subscribers, throttle, lease)
+        except ChunkStopped as e:
+            if e.deliveries:
+                record_deliveries(e.deliveries)
+            # Left for the next run straight away, not after the lease runs out
+            db.session.execute(
+                update(NewsletterCampaign)
+                .where(NewsletterCampaign.id == campaign_id, NewsletterCampaign.run_id == run_id)
+                .values(status='interrupted', lease_until=None)
+            )
+            db.session.commit()
+            logger.warning('Campaign %s interrupted: %s', campaign_id, e.__cause__ or e)
+            return False
+
+        try:
+            db.session.execute(insert(CampaignDelivery), deliveries)
+            db.session.commit()
+            last_id = subscribers[-1].id
+        except IntegrityError:
+            # A run we took over from recorded some of these recipients first
+            db.session.rollback()
+            if not owns_campaign(campaign_id, run_id):
+                return True
+            record_deliveries(deliveries)
+            last_id = last_recorded_id(campaign_id)
+
+    db.session.execute(
+        update(NewsletterCampaign)
+        .where(NewsletterCampaign.id == campaign_id, NewsletterCampaign.run_id == run_id)
+        .values(status='completed', lease_until=None, finished_at=datetime.now())
+    )
+    db.session.commit()
+    return True
@@ -0,0 +1,103 @@
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'application/json',
+    'text/csv',
+    'text/html',
+    'text/plain',
+])
+
+
+def init_app(app):
+    app.after_request(compress_response)
+
+
+def negotiate(size=None):
+    """Pick the encoding for this request, or None to send the body as is.
+
+    ``size`` is the body length when known; smaller bodies than
+    ``COMPRESS_MIN_SIZE`` aren't worth the CPU or the extra header bytes.
+    """
+    config = current_app.config
+    if not config.get('COMPRESS_ENABLED', True):
+        return None
+    if size is not None and size < config.get('COMPRESS_MIN_SIZE', 500):
+        return None
+    offered = ['br', 'gzip'] if brotli and config.get('COMPRESS_BROTLI', True) else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def _gzip_compressor():
+    return zlib.compressobj(current_app.config.get('COMPRESS_LEVEL', 6), zlib.DEFLATED, 31)
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=current_app.config.get('COMPRESS_BROTLI_LEVEL', 4))
+    compressor = _gzip_compressor()
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of chunks, flushing after each so it still streams.
+
+    The compressor is set up here rather than in the generator, which runs
+    after the app context is gone.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=current_app.config.get('COMPRESS_BROTLI_LEVEL', 4))
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = _gzip_compressor()
+        process, finish = compressor.compress, compressor.flush
+
+        def flush():
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def generate():
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                if chunk:
+                    yield process(chunk) + flush()
+            yield finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    return generate()
+
+
+def compress_response(response):
+    """after_request hook compressing JSON and CSV bodies the client accepts"""
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    if response.is_streamed:
+        encoding = negotiate()
+        if encoding:
+            response.response = compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        encoding = negotiate(len(data))
+        if encoding:
+            response.set_data(compress(data, encoding))
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+    return response
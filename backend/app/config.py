@@ -8,7 +8,18 @@ class Config:
     if SQLALCHEMY_DATABASE_URI and SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace('postgres://', 'postgresql://', 1)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool (ignored for SQLite). Pre-ping and recycle guard against
+    # connections the managed Postgres has already closed; DB_POOL_WARMUP
+    # connections are opened when each worker boots.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True") == "True"
+    DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 2))
     SECRET_KEY = os.getenv("SECRET_KEY", "dev")
+    # Lifetime of signed admin API tokens, in seconds
+    ADMIN_TOKEN_MAX_AGE = int(os.getenv("ADMIN_TOKEN_MAX_AGE", 12 * 60 * 60))
     MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
     MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
     MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "True") == "True"
@@ -19,9 +30,89 @@ class Config:
     MAIL_DEBUG = True
     MAIL_SUPPRESS_SEND = False
     MAIL_ASCII_ATTACHMENTS = False
+
+    # Reused SMTP sessions: open at most MAIL_POOL_SIZE, drop after idling
+    # MAIL_POOL_MAX_IDLE seconds or sending MAIL_POOL_MAX_MESSAGES messages
+    MAIL_POOL_SIZE = int(os.getenv("MAIL_POOL_SIZE", 4))
+    MAIL_POOL_MAX_IDLE = int(os.getenv("MAIL_POOL_MAX_IDLE", 60))
+    MAIL_POOL_MAX_MESSAGES = int(os.getenv("MAIL_POOL_MAX_MESSAGES", 100))
+
+    # Background email delivery: "thread", "database" or "sync"
+    EMAIL_QUEUE_BACKEND = os.getenv("EMAIL_QUEUE_BACKEND", "thread")
+    EMAIL_QUEUE_WORKERS = int(os.getenv("EMAIL_QUEUE_WORKERS", 4))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 4))
+    EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", 2))
+    EMAIL_QUEUE_POLL_INTERVAL = float(os.getenv("EMAIL_QUEUE_POLL_INTERVAL", 5))
+
+    # Newsletter campaigns: subscribers per chunk and messages per second (0 = unthrottled)
+    NEWSLETTER_CHUNK_SIZE = int(os.getenv("NEWSLETTER_CHUNK_SIZE", 100))
+    NEWSLETTER_RATE_LIMIT = float(os.getenv("NEWSLETTER_RATE_LIMIT", 10))
+    # Seconds a sender holds a campaign without renewing; a resume waits this long after a crash
+    NEWSLETTER_LEASE = int(os.getenv("NEWSLETTER_LEASE", 300))
+
+    # Bulk subscriber import: rows per INSERT ... ON CONFLICT DO NOTHING batch
+    NEWSLETTER_IMPORT_BATCH_SIZE = int(os.getenv("NEWSLETTER_IMPORT_BATCH_SIZE", 1000))
     CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
     CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
     CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
+
+    # Per-worker cache of taken tables per reservation time slot
+    SLOT_CACHE_SIZE = int(os.getenv("SLOT_CACHE_SIZE", 2048))
+    SLOT_CACHE_TTL = int(os.getenv("SLOT_CACHE_TTL", 10))
+
+    # Per-worker cache of the grouped menu; MENU_CACHE_MAX_AGE is the browser
+    # max-age (0 = revalidate with the ETag on every load)
+    MENU_CACHE_TTL = int(os.getenv("MENU_CACHE_TTL", 300))
+    MENU_CACHE_MAX_AGE = int(os.getenv("MENU_CACHE_MAX_AGE", 0))
+
+    # Same for the composite /api/gallery/landing payload
+    LANDING_CACHE_TTL = int(os.getenv("LANDING_CACHE_TTL", 300))
+    LANDING_CACHE_MAX_AGE = int(os.getenv("LANDING_CACHE_MAX_AGE", 0))
+
+    # Response compression (gzip, plus brotli when the package is installed)
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "True") == "True"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 500))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_BROTLI = os.getenv("COMPRESS_BROTLI", "True") == "True"
+    COMPRESS_BROTLI_LEVEL = int(os.getenv("COMPRESS_BROTLI_LEVEL", 4))
+    
+    # Rate limits for unauthenticated writes, per client IP ("count/period").
+    # RATELIMIT_BACKEND=sqlite shares buckets between workers on one host;
+    # set RATELIMIT_PROXY_COUNT to the number of proxies in front of the app.
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "True") == "True"
+    RATELIMIT_BACKEND = os.getenv("RATELIMIT_BACKEND", "memory")
+    RATELIMIT_STORAGE_PATH = os.getenv("RATELIMIT_STORAGE_PATH")
+    RATELIMIT_PROXY_COUNT = int(os.getenv("RATELIMIT_PROXY_COUNT", 0))
+    RATELIMIT_LOGIN = os.getenv("RATELIMIT_LOGIN", "5/minute")
+    RATELIMIT_RESERVATIONS = os.getenv("RATELIMIT_RESERVATIONS", "10/minute")
+    RATELIMIT_NEWSLETTER = os.getenv("RATELIMIT_NEWSLETTER", "5/minute")
+
+    # Logging: JSON lines on stdout, written from a background thread.
+    # LOG_LEVELS overrides per logger, e.g. "app.access=WARNING,werkzeug=WARNING"
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+
+    # Report per-request query count and DB time in a Server-Timing header,
+    # and log statements slower than SLOW_QUERY_MS (0 disables the log)
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "True") == "True"
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+
+    # Optional bearer token required to scrape /metrics
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Origins allowed to call the API with credentials (comma-separated)
+    CORS_ORIGINS = [
+        origin.strip() for origin in os.getenv(
+            "CORS_ORIGINS",
+            "http://localhost:5173,"
+            "http://127.0.0.1:5173,"
+            "https://cafe-fausse-z85a.onrender.com,"
+            "https://cafe-fausse-frontend.onrender.com,"
+            "https://cafe-fausse.onrender.com"
+        ).split(",") if origin.strip()
+    ]
+    # How long browsers may cache a preflight response, in seconds
+    CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", 86400))
     
     # Session configuration for production
     SESSION_COOKIE_SECURE = True
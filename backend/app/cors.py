@@ -0,0 +1,34 @@
+from flask import request
+
+ALLOWED_METHODS = 'GET, POST, PUT, DELETE, OPTIONS'
+ALLOWED_HEADERS = 'Content-Type, Authorization'
+
+
+def init_app(app):
+    """Answer CORS preflights before dispatch and tag responses for allowed origins.
+
+    The origin set and preflight headers are built once here; per request
+    the work is one set lookup.
+    """
+    origins = frozenset(app.config.get('CORS_ORIGINS', ()))
+    preflight_headers = {
+        'Access-Control-Allow-Methods': ALLOWED_METHODS,
+        'Access-Control-Allow-Headers': ALLOWED_HEADERS,
+        'Access-Control-Max-Age': str(app.config.get('CORS_MAX_AGE', 86400)),
+    }
+
+    @app.before_request
+    def answer_preflight():
+        if request.method == 'OPTIONS' and 'Access-Control-Request-Method' in request.headers:
+            if request.headers.get('Origin') in origins:
+                return '', 204, preflight_headers
+            return '', 204
+
+    @app.after_request
+    def add_cors_headers(response):
+        origin = request.headers.get('Origin')
+        if origin in origins:
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.headers['Access-Control-Allow-Credentials'] = 'true'
+        response.vary.add('Origin')
+        return response
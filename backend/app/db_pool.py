@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Counters for one connection pool, updated from pool events"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.waited = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidated = 0
+
+    def record_wait(self, ms, timed_out=False):
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if ms >= 1:
+                self.waited += 1
+            self.wait_ms_total += ms
+            self.wait_ms_max = max(self.wait_ms_max, ms)
+
+    def count(self, attr):
+        with self.lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def as_dict(self):
+        with self.lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'checkouts_waited': self.waited,
+                'wait_ms_avg': round(self.wait_ms_total / attempts, 3) if attempts else 0,
+                'wait_ms_max': round(self.wait_ms_max, 3),
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidated': self.invalidated,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        event.listen(self, 'connect', lambda *args: self.stats.count('connects'))
+        event.listen(self, 'invalidate', lambda *args: self.stats.count('invalidated'))
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        self.stats.record_wait((time.perf_counter() - started) * 1000)
+        return conn
+
+
+def is_sqlite(app):
+    return (app.config.get('SQLALCHEMY_DATABASE_URI') or '').startswith('sqlite')
+
+
+def engine_options(app):
+    """Pool settings from the DB_POOL_* config; SQLite keeps Flask-SQLAlchemy's defaults"""
+    if is_sqlite(app):
+        return {}
+    config = app.config
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_POOL_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+    }
+
+
+def configure(app):
+    """Fill in SQLALCHEMY_ENGINE_OPTIONS; call before ``db.init_app``"""
+    options = engine_options(app)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def warm_up(app):
+    """Open DB_POOL_WARMUP connections now so the first requests don't pay for connecting"""
+    count = app.config.get('DB_POOL_WARMUP', 0)
+    if not count or is_sqlite(app):
+        return
+    with app.app_context():
+        count = min(count, db.engine.pool.size())
+        connections = []
+        try:
+            for _ in range(count):
+                conn = db.engine.connect()
+                conn.execute(text('SELECT 1'))
+                connections.append(conn)
+        except Exception:
+            logger.exception('Database pool warm-up failed after %d connections', len(connections))
+        finally:
+            for conn in connections:
+                conn.close()
+        logger.info('Database pool warmed up with %d connections', len(connections))
+
+
+def pool_status():
+    """Current occupancy and wait statistics of the app's engine pool"""
+    pool = db.engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(stats.as_dict())
+    return status
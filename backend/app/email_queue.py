@@ -0,0 +1,315 @@
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EmailQueue:
+    """Runs email tasks off the request thread.
+
+    Tasks are plain functions registered under a name with ``@task(name)``.
+    They take one JSON-serializable argument and return True on success, so
+    a job can be stored in the database and retried later by any worker.
+    The backend is picked with ``EMAIL_QUEUE_BACKEND``:
+
+    - ``thread``: in-process thread pool (default)
+    - ``database``: durable ``EmailJob`` rows polled by a background thread
+    - ``sync``: run immediately on the calling thread (tests, scripts)
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self.backend = None
+        atexit.register(self.shutdown)
+
+    def task(self, name):
+        def register(func):
+            self.tasks[name] = func
+            return func
+        return register
+
+    def init_app(self, app):
+        if self.backend is not None:
+            self.backend.shutdown()
+        kind = app.config.get('EMAIL_QUEUE_BACKEND', 'thread')
+        backends = {'thread': ThreadPoolBackend, 'database': DatabaseBackend, 'sync': SyncBackend}
+        if kind not in backends:
+            raise ValueError(f'Unknown EMAIL_QUEUE_BACKEND: {kind}')
+        self.backend = backends[kind](app, self)
+        app.extensions['email_queue'] = self
+
+    def enqueue(self, name, payload):
+        """Schedule a registered task; returns without waiting for delivery"""
+        if name not in self.tasks:
+            raise KeyError(f'Unknown email task: {name}')
+        self.backend.enqueue(name, payload)
+
+    def run(self, app, name, payload):
+        """Run one attempt of a task inside an app context; True on success"""
+        with app.app_context():
+            try:
+                ok = bool(self.tasks[name](payload))
+            except Exception:
+                logger.exception('Email task %s raised', name)
+                ok = False
+            metrics.email_task_finished(name, ok)
+            return ok
+
+    def renew_lease(self):
+        """Extend the claim on the job running on this thread.
+
+        Long-running tasks call this between units of work so no other
+        worker picks their job up again. Returns False once another worker
+        has claimed the job, after which the task should stop; backends
+        without leases always return True.
+        """
+        return self.backend.renew_lease() if self.backend is not None else True
+
+    def shutdown(self, wait=True):
+        """Drain in-flight jobs and stop the backend's worker threads"""
+        if self.backend is not None:
+            self.backend.shutdown(wait=wait)
+
+
+class SyncBackend:
+    def __init__(self, app, queue):
+        self.app = app
+        self.queue = queue
+
+    def enqueue(self, name, payload):
+        self.queue.run(self.app, name, payload)
+
+    def renew_lease(self):
+        return True
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class ThreadPoolBackend:
+    """Delivers jobs on a thread pool, retrying with exponential backoff.
+
+    Workers never sleep: a failed attempt schedules its retry on a daemon
+    ``threading.Timer`` that submits it back to the pool when due. On
+    shutdown the pending timers are cancelled and each of those jobs gets
+    one last attempt instead of waiting out its backoff.
+    """
+
+    def __init__(self, app, queue):
+        self.app = app
+        self.queue = queue
+        self.max_attempts = app.config.get('EMAIL_MAX_ATTEMPTS', 4)
+        self.backoff = app.config.get('EMAIL_RETRY_BACKOFF', 2)
+        self.closing = False
+        # Pending retry timers and the (name, payload, attempt) each will submit
+        self.retries = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config.get('EMAIL_QUEUE_WORKERS', 4),
+            thread_name_prefix='email-queue'
+        )
+
+    def enqueue(self, name, payload):
+        self.executor.submit(self.deliver, name, payload)
+
+    def renew_lease(self):
+        return True
+
+    def deliver(self, name, payload, attempt=1):
+        """Run one attempt; on failure schedule the next one unless attempts are used up"""
+        if self.queue.run(self.app, name, payload):
+            return True
+        if attempt < self.max_attempts and self.schedule_retry(name, payload, attempt + 1):
+            return False
+        logger.error('Email task %s failed after %d attempts', name, attempt)
+        return False
+
+    def schedule_retry(self, name, payload, attempt):
+        """Start the backoff timer for ``attempt``; False once the backend is closing"""
+        timer = threading.Timer(self.backoff * 2 ** (attempt - 2), self.retry_due)
+        timer.daemon = True
+        with self.lock:
+            if self.closing:
+                return False
+            self.retries[timer] = (name, payload, attempt)
+        timer.start()
+        return True
+
+    def retry_due(self):
+        # Runs on the timer's own thread, which is the key of its retry
+        with self.lock:
+            retry = self.retries.get(threading.current_thread())
+            if retry is None:
+                return  # cancelled by shutdown()
+            try:
+                self.executor.submit(self.deliver, *retry)
+            except RuntimeError:
+                return  # the interpreter is exiting; shutdown() makes the last attempt
+            del self.retries[threading.current_thread()]
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            self.closing = True
+            retries = list(self.retries.items())
+            self.retries.clear()
+        for timer, _ in retries:
+            timer.cancel()
+        self.executor.shutdown(wait=wait)
+        for _, (name, payload, attempt) in retries:
+            if wait:
+                self.deliver(name, payload, attempt)
+            else:
+                logger.error('Email task %s dropped at shutdown before attempt %d', name, attempt)
+
+
+class DatabaseBackend:
+    """Stores jobs as EmailJob rows and delivers them from polling threads.
+
+    Jobs survive restarts, and several workers can poll the same table: a
+    job is claimed with a conditional UPDATE, and the claim is a lease, so a
+    job held by a worker that died is picked up again once the lease expires.
+    Each process runs ``EMAIL_QUEUE_WORKERS`` pollers, so a long job such as
+    a newsletter campaign doesn't hold up the others; it keeps its lease with
+    ``renew_lease()``. Updates to a job are fenced by the attempt count its
+    claim set, so a worker whose job was claimed again can't overwrite it.
+    """
+
+    def __init__(self, app, queue):
+        from app import db
+        from app.models import EmailJob
+        self.db = db
+        self.EmailJob = EmailJob
+        self.app = app
+        self.queue = queue
+        self.max_attempts = app.config.get('EMAIL_MAX_ATTEMPTS', 4)
+        self.backoff = app.config.get('EMAIL_RETRY_BACKOFF', 2)
+        self.poll_interval = app.config.get('EMAIL_QUEUE_POLL_INTERVAL', 5)
+        self.lease = timedelta(seconds=app.config.get('EMAIL_QUEUE_LEASE', 300))
+        self.batch_size = app.config.get('EMAIL_QUEUE_BATCH_SIZE', 20)
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        # The claim (job id, attempts) of the job running on each poller thread
+        self.current = threading.local()
+        self.threads = [
+            threading.Thread(target=self.poll, name=f'email-queue-poller-{i}', daemon=True)
+            for i in range(app.config.get('EMAIL_QUEUE_WORKERS', 4))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def enqueue(self, name, payload):
+        now = datetime.now()
+        # Use a separate connection so the caller's session is left untouched
+        with self.db.engine.begin() as conn:
+            conn.execute(self.EmailJob.__table__.insert().values(
+                task=name, payload=payload, status='pending', attempts=0,
+                created_at=now, next_attempt_at=now
+            ))
+        self.wakeup.set()
+
+    def poll(self):
+        while not self.stopping.is_set():
+            try:
+                with self.app.app_context():
+                    processed = self.process_due_jobs()
+            except Exception:
+                logger.exception('Email queue poll failed')
+                processed = 0
+            if not processed:
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+
+    def process_due_jobs(self):
+        job_table = self.EmailJob.__table__
+        now = datetime.now()
+        with self.db.engine.connect() as conn:
+            due = conn.execute(
+                job_table.select()
+                .where(job_table.c.status.in_(['pending', 'sending']), job_table.c.next_attempt_at <= now)
+                .order_by(job_table.c.next_attempt_at)
+                .limit(self.batch_size)
+            ).all()
+
+        processed = 0
+        for job in due:
+            if self.stopping.is_set():
+                break
+            if not self.claim(job):
+                continue
+            processed += 1
+            attempts = job.attempts + 1
+            self.current.claim = (job.id, attempts)
+            self.current.held = True
+            self.current.renewed_at = time.monotonic()
+            try:
+                ok = self.queue.run(self.app, job.task, job.payload)
+            finally:
+                self.current.claim = None
+            if ok:
+                self.finish(job.id, attempts, status='sent', sent_at=datetime.now())
+            elif attempts >= self.max_attempts:
+                self.finish(job.id, attempts, status='failed')
+            else:
+                retry_at = datetime.now() + timedelta(seconds=self.backoff * 2 ** (attempts - 1))
+                self.finish(job.id, attempts, status='pending', next_attempt_at=retry_at)
+        return processed
+
+    def claim(self, job):
+        job_table = self.EmailJob.__table__
+        with self.db.engine.begin() as conn:
+            result = conn.execute(
+                job_table.update()
+                .where(
+                    job_table.c.id == job.id,
+                    job_table.c.status == job.status,
+                    job_table.c.next_attempt_at == job.next_attempt_at
+                )
+                .values(status='sending', attempts=job.attempts + 1, next_attempt_at=datetime.now() + self.lease)
+            )
+        return result.rowcount == 1
+
+    def holds(self, job_id, attempts):
+        """Condition matching a job only while the claim that set ``attempts`` holds it"""
+        job_table = self.EmailJob.__table__
+        return (job_table.c.id == job_id) & (job_table.c.status == 'sending') & (job_table.c.attempts == attempts)
+
+    def finish(self, job_id, attempts, **values):
+        job_table = self.EmailJob.__table__
+        with self.db.engine.begin() as conn:
+            conn.execute(job_table.update().where(self.holds(job_id, attempts)).values(**values))
+
+    def renew_lease(self):
+        # Renewing every third of the lease keeps it from expiring without a write per call
+        claim = getattr(self.current, 'claim', None)
+        if claim is None:
+            return True
+        if not self.current.held:
+            return False
+        if time.monotonic() - self.current.renewed_at < self.lease.total_seconds() / 3:
+            return True
+        job_table = self.EmailJob.__table__
+        with self.db.engine.begin() as conn:
+            renewed = conn.execute(
+                job_table.update().where(self.holds(*claim)).values(next_attempt_at=datetime.now() + self.lease)
+            ).rowcount == 1
+        if not renewed:
+            self.current.held = False
+            logger.warning('Email job %s was claimed by another worker', claim[0])
+            return False
+        self.current.renewed_at = time.monotonic()
+        return True
+
+    def shutdown(self, wait=True):
+        # Pending rows stay in the table for the next worker to pick up
+        self.stopping.set()
+        self.wakeup.set()
+        if wait:
+            for thread in self.threads:
+                if thread.is_alive():
+                    thread.join()
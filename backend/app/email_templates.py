@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from flask_mail import Message
+from jinja2 import Environment, PackageLoader
+
+TEMPLATE_NAMES = (
+    'reservation_confirmation',
+    'reservation_cancellation',
+    'reservation_update',
+    'admin_notification',
+    'newsletter_welcome',
+)
+
+
+def format_slot_time(value):
+    """Format a reservation time slot (datetime or ISO string) for emails"""
+    if not value:
+        return 'TBD'
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return value
+    return value.strftime('%B %d, %Y at %I:%M %p')
+
+
+def reservation_context(reservation):
+    """Flatten a Reservation and its customer into the fields templates use.
+
+    Dicts shaped like the reservation API responses are passed through, so
+    queued jobs and the /api/email endpoints can render from JSON payloads.
+    """
+    if isinstance(reservation, dict):
+        return reservation
+    customer = reservation.customer
+    return {
+        'id': reservation.id,
+        'customer_name': customer.name if customer else None,
+        'email': customer.email if customer else None,
+        'phone': customer.phone if customer else None,
+        'time_slot': reservation.time_slot,
+        'table_number': reservation.table_number,
+        'number_of_guests': reservation.number_of_guests
+    }
+
+
+class EmailTemplates:
+    """Registry of email templates, compiled once when the app starts.
+
+    Each template in ``app/templates/email`` defines ``subject()``, ``text()``
+    and ``html()`` macros, so the plain-text and HTML parts of a message
+    come from a single file.
+    """
+
+    def __init__(self):
+        self.env = Environment(
+            loader=PackageLoader('app', 'templates/email'),
+            autoescape=True,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False
+        )
+        self.env.filters['slot_time'] = format_slot_time
+        self.templates = {}
+
+    def init_app(self, app):
+        for name in TEMPLATE_NAMES:
+            self.templates[name] = self.env.get_template(f'{name}.jinja')
+        app.extensions['email_templates'] = self
+
+    def render(self, name, reservation=None, **context):
+        """Return (subject, text, html) for a template"""
+        if reservation is not None:
+            context['r'] = reservation_context(reservation)
+        module = self.templates[name].make_module(context)
+        return str(module.subject()).strip(), str(module.text()).strip() + '\n', str(module.html()).strip()
+
+    def message(self, name, recipients, reservation=None, **context):
+        """Build a Flask-Mail Message with both parts rendered from a template"""
+        subject, body, html = self.render(name, reservation, **context)
+        return Message(subject=subject, recipients=recipients, body=body, html=html)
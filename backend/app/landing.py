@@ -0,0 +1,51 @@
+from app.cache import TTLCache
+from app.models import AboutInfo, Award, GalleryImage, Review
+from app.schemas import select_dicts
+
+# Founders are static for now, as in SRS
+FOUNDERS = [
+    {"name": "Chef Antonio Rossi", "bio": "Award-winning chef with a passion for Italian cuisine and modern techniques."},
+    {"name": "Maria Lopez", "bio": "Restaurateur dedicated to excellent food, unforgettable dining, and locally sourced ingredients."}
+]
+
+# The composite landing payload; dropped by every gallery and about write
+LANDING_KEY = 'landing'
+landing_cache = TTLCache(maxsize=1, ttl=300)
+
+
+def init_app(app):
+    landing_cache.ttl = app.config.get('LANDING_CACHE_TTL', landing_cache.ttl)
+    landing_cache.clear()
+
+
+def invalidate():
+    landing_cache.pop(LANDING_KEY)
+
+
+def gallery_images():
+    return select_dicts(GalleryImage.id, GalleryImage.url, GalleryImage.caption)
+
+
+def awards():
+    return select_dicts(Award.id, Award.title, Award.year)
+
+
+def reviews():
+    return select_dicts(Review.id, Review.review, Review.source)
+
+
+def about_info():
+    about = AboutInfo.query.first()
+    if not about:
+        return {'history': '', 'mission': '', 'founders': []}
+    return {'history': about.history, 'mission': about.mission, 'founders': FOUNDERS}
+
+
+def load_landing():
+    """Everything the home and gallery pages show, in one document"""
+    return {
+        'images': gallery_images(),
+        'awards': awards(),
+        'reviews': reviews(),
+        'about': about_info()
+    }
@@ -0,0 +1,142 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import time
+import uuid
+from datetime import date, datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+access_logger = logging.getLogger('app.access')
+
+# Attributes every LogRecord has; anything else was passed with ``extra=``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+# Argument types that can't change between logging and formatting on the listener
+_IMMUTABLE_ARGS = (str, bytes, int, float, bool, type(None), date, uuid.UUID)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestQueueHandler(QueueHandler):
+    """Hands records to the listener thread without formatting them.
+
+    The stock QueueHandler renders the message on the calling thread; here
+    only the request context is attached, and ``%``-interpolation, JSON
+    encoding and the write all happen on the listener thread. That holds
+    when the arguments are immutable scalars; if any other object is passed
+    (a list, a dict, a model instance) the message is rendered here, as the
+    stock handler does, since the object may change before the listener
+    formats it.
+    """
+
+    def prepare(self, record):
+        # Other handlers may still see the original record, so only change a copy
+        record = copy.copy(record)
+        if has_request_context():
+            if g.get('request_id'):
+                record.request_id = g.request_id
+            record.method = request.method
+            record.route = request.url_rule.rule if request.url_rule else request.path
+        if record.exc_info and not record.exc_text:
+            # Tracebacks reference frames that may change before the listener runs
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        if isinstance(record.args, dict):
+            # ``%(name)s`` style; the mapping is the caller's own object
+            args = record.args.values()
+            record.args = dict(record.args)
+        else:
+            args = record.args or ()
+        if not all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def parse_levels(value):
+    """Parse ``"app.routes=DEBUG,sqlalchemy.engine=WARNING"`` into a dict"""
+    if isinstance(value, dict):
+        return value
+    levels = {}
+    for item in (value or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure(app):
+    """Route all logging through a queue to a JSON stream handler on stdout"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JSONFormatter())
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, RequestQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(RequestQueueHandler(log_queue))
+    root.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+    for name, level in parse_levels(app.config.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level)
+
+
+def init_app(app):
+    configure(app)
+
+    @app.before_request
+    def start_request_log():
+        g.request_started = time.perf_counter()
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+
+    @app.after_request
+    def log_request(response):
+        started = g.pop('request_started', None)
+        if started is not None and access_logger.isEnabledFor(logging.INFO):
+            access_logger.info('%s %s %s', request.method, request.path, response.status_code, extra={
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            })
+        if g.get('request_id'):
+            response.headers['X-Request-ID'] = g.request_id
+        return response
+
+
+# Registered when app is first imported, before the email queue registers its
+# drain; atexit runs handlers last-registered first, so records logged while
+# the queue drains are still written.
+@atexit.register
+def _flush():
+    if _listener is not None:
+        _listener.stop()
@@ -0,0 +1,137 @@
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from flask_mail import Connection
+
+from app import metrics
+
+# Errors that leave the SMTP session itself intact; anything else (disconnects,
+# timeouts, 4xx shutdowns) means the session is discarded and reopened
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.connection.__exit__(None, None, None)
+        except Exception:
+            pass
+
+
+class SMTPPool:
+    """Reuses a few authenticated Flask-Mail connections across sends.
+
+    Opening a session costs a TCP connect, STARTTLS and LOGIN, which is far
+    more than sending a message over it. Idle sessions are kept for
+    ``MAIL_POOL_MAX_IDLE`` seconds and recycled after
+    ``MAIL_POOL_MAX_MESSAGES`` messages; at most ``MAIL_POOL_SIZE`` are open
+    at once. A send that fails because the server dropped the session is
+    retried once on a fresh connection.
+    """
+
+    def __init__(self, size=4, max_idle=60, max_messages=100):
+        self.size = size
+        self.max_idle = max_idle
+        self.max_messages = max_messages
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def init_app(self, app):
+        self.close_all()
+        self.size = app.config.get('MAIL_POOL_SIZE', self.size)
+        self.max_idle = app.config.get('MAIL_POOL_MAX_IDLE', self.max_idle)
+        self.max_messages = app.config.get('MAIL_POOL_MAX_MESSAGES', self.max_messages)
+        self._slots = threading.BoundedSemaphore(self.size)
+        app.extensions['smtp_pool'] = self
+
+    def _open(self):
+        connection = Connection(current_app.extensions['mail'])
+        return PooledConnection(connection.__enter__())
+
+    def _acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                pooled = self._idle.pop()
+                if now - pooled.last_used < self.max_idle:
+                    return pooled
+                pooled.close()
+        return self._open()
+
+    def _release(self, pooled):
+        pooled.last_used = time.monotonic()
+        if pooled.sent >= self.max_messages:
+            pooled.close()
+            return
+        with self._lock:
+            self._idle.append(pooled)
+
+    @contextmanager
+    def connection(self):
+        """Check out a pooled session; yields a ``send(message)`` callable"""
+        self._slots.acquire()
+        try:
+            try:
+                pooled = self._acquire()
+            except Exception:
+                # No session means the message the caller was about to send fails
+                metrics.email_message_finished(False)
+                raise
+            holder = [pooled]
+
+            def send(message):
+                try:
+                    try:
+                        holder[0].connection.send(message)
+                    except MESSAGE_ERRORS:
+                        raise
+                    except (smtplib.SMTPException, OSError):
+                        holder[0].close()
+                        holder[0] = self._open()
+                        holder[0].connection.send(message)
+                except Exception:
+                    metrics.email_message_finished(False)
+                    raise
+                metrics.email_message_finished(True)
+                holder[0].sent += 1
+
+            try:
+                yield send
+            except MESSAGE_ERRORS:
+                self._release(holder[0])
+                raise
+            except BaseException:
+                holder[0].close()
+                raise
+            else:
+                self._release(holder[0])
+        finally:
+            self._slots.release()
+
+    def send(self, message):
+        with self.connection() as send:
+            send(message)
+
+    def send_batch(self, messages):
+        """Send several messages over one session; returns the number sent"""
+        sent = 0
+        with self.connection() as send:
+            for message in messages:
+                send(message)
+                sent += 1
+        return sent
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            pooled.close()
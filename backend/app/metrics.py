@@ -0,0 +1,73 @@
+"""
+Prometheus metrics for requests, email and database queries
+
+Each worker keeps its own counters in memory. Under gunicorn, set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty directory before the workers start:
+every worker then writes its samples there and ``/metrics`` on any worker
+reports the sum over all of them (see ``gunicorn.conf.py``).
+"""
+
+import os
+import time
+
+from flask import Response, current_app, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by endpoint and status',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling HTTP requests',
+    ['blueprint', 'endpoint', 'method']
+)
+EMAIL_TASKS = Counter('email_tasks_total', 'Email task attempts by task and result', ['task', 'result'])
+EMAIL_MESSAGES = Counter('email_messages_total', 'Messages handed to the SMTP server by result', ['result'])
+DB_QUERIES = Counter('db_queries_total', 'SQL statements executed')
+DB_QUERY_SECONDS = Counter('db_query_seconds_total', 'Time spent executing SQL statements')
+
+
+def init_app(app):
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            # Unmatched URLs share one label so 404 scans can't blow up cardinality
+            endpoint = request.endpoint or 'unmatched'
+            blueprint = request.blueprint or ''
+            REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+            REQUESTS.labels(blueprint, endpoint, request.method, response.status_code).inc()
+        return response
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return {'error': 'Metrics token required.'}, 401
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def email_task_finished(task, ok):
+    EMAIL_TASKS.labels(task, 'sent' if ok else 'failed').inc()
+
+
+def email_message_finished(ok):
+    EMAIL_MESSAGES.labels('sent' if ok else 'failed').inc()
+
+
+def query_finished(seconds):
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.inc(seconds)
@@ -25,8 +25,15 @@ class Customer(db.Model):
     reservations = db.relationship('Reservation', backref='customer', lazy=True)
 
 class Reservation(db.Model):
+    # A table can only be booked once per time slot; its index also serves
+    # lookups by time_slot. (time_slot, id) backs the keyset-paginated admin list.
+    __table_args__ = (
+        db.UniqueConstraint('time_slot', 'table_number', name='uq_reservation_time_slot_table'),
+        db.Index('ix_reservation_time_slot_id', 'time_slot', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False, index=True)
     time_slot = db.Column(db.DateTime, nullable=False)
     table_number = db.Column(db.Integer, nullable=False)
     number_of_guests = db.Column(db.Integer, nullable=False)  # Optional field for guests
@@ -62,3 +69,40 @@ class AboutInfo(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     history = db.Column(db.Text)
     mission = db.Column(db.Text)
+
+class EmailJob(db.Model):
+    """Outgoing email queued by the database email queue backend"""
+    id = db.Column(db.Integer, primary_key=True)
+    task = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, index=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+class NewsletterCampaign(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    body_text = db.Column(db.Text, nullable=False)
+    body_html = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(16), nullable=False, default='queued')  # queued, sending, interrupted, completed
+    run_id = db.Column(db.String(32), nullable=True)  # identifies the sender currently working on it
+    lease_until = db.Column(db.DateTime, nullable=True)  # the sender holds the campaign until then
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+class CampaignDelivery(db.Model):
+    """Per-recipient progress of a campaign, so an interrupted run can resume"""
+    __table_args__ = (
+        db.UniqueConstraint('campaign_id', 'newsletter_id', name='uq_campaign_delivery_recipient'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.Integer, db.ForeignKey('newsletter_campaign.id'), nullable=False)
+    newsletter_id = db.Column(db.Integer, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    status = db.Column(db.String(16), nullable=False)  # sent, failed
+    error = db.Column(db.String(255), nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,167 @@
+import random
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.cache import TTLCache
+from app.models import Reservation
+
+TABLE_COUNT = 30
+ALL_TABLES = (1 << TABLE_COUNT) - 1
+
+SLOT_MINUTES = 30
+# Opening hours by weekday (Monday=0): Mon–Sat 5PM–11PM, Sun 5PM–9PM
+SERVICE_HOURS = {0: (17, 23), 1: (17, 23), 2: (17, 23), 3: (17, 23), 4: (17, 23), 5: (17, 23), 6: (17, 21)}
+
+# time_slot -> bitmap of taken tables (bit n-1 set when table n is booked).
+# This is a per-worker hint, not the source of truth: another worker's
+# bookings only show up here after the TTL or a conflict. Correctness relies on
+# the uq_reservation_time_slot_table constraint, which book_table() treats as
+# the final check before a table is handed out.
+slot_cache = TTLCache(maxsize=2048, ttl=10)
+# date -> {time_slot: number of reservations}
+day_cache = TTLCache(maxsize=400, ttl=10)
+
+
+def init_app(app):
+    """Size the occupancy caches from the app config"""
+    slot_cache.maxsize = app.config.get('SLOT_CACHE_SIZE', slot_cache.maxsize)
+    slot_cache.ttl = app.config.get('SLOT_CACHE_TTL', slot_cache.ttl)
+    day_cache.ttl = app.config.get('SLOT_CACHE_TTL', day_cache.ttl)
+
+
+def table_bit(table_number):
+    return 1 << (table_number - 1)
+
+
+def load_taken_mask(time_slot):
+    """Build the bitmap for a slot from a narrow SELECT of table numbers"""
+    mask = 0
+    rows = db.session.execute(
+        select(Reservation.table_number).where(Reservation.time_slot == time_slot)
+    )
+    for (table_number,) in rows:
+        if 1 <= table_number <= TABLE_COUNT:
+            mask |= table_bit(table_number)
+    return mask
+
+
+def taken_mask(time_slot, refresh=False):
+    """Return the taken-table bitmap for a slot, hitting the DB only on a miss"""
+    if not refresh:
+        mask = slot_cache.get(time_slot)
+        if mask is not None:
+            return mask
+    stamp = slot_cache.stamp(time_slot)
+    mask = load_taken_mask(time_slot)
+    slot_cache.set(time_slot, mask, stamp)
+    return mask
+
+
+def pick_free_table(mask):
+    """Pick a random free table from a bitmap, or None if the slot is full"""
+    free = ALL_TABLES & ~mask
+    if not free:
+        return None
+    for _ in range(random.randrange(bin(free).count('1'))):
+        free &= free - 1
+    return (free & -free).bit_length()
+
+
+def mark_taken(time_slot, table_number):
+    day_cache.pop(time_slot.date())
+    if 1 <= table_number <= TABLE_COUNT:
+        slot_cache.update(time_slot, lambda mask: mask | table_bit(table_number))
+    else:
+        slot_cache.pop(time_slot)
+
+
+def mark_free(time_slot, table_number):
+    day_cache.pop(time_slot.date())
+    if 1 <= table_number <= TABLE_COUNT:
+        slot_cache.update(time_slot, lambda mask: mask & ~table_bit(table_number))
+    else:
+        slot_cache.pop(time_slot)
+
+
+def invalidate_slot(time_slot):
+    day_cache.pop(time_slot.date())
+    slot_cache.pop(time_slot)
+
+
+def service_slots(day):
+    """Bookable time slots for a date, every SLOT_MINUTES during opening hours"""
+    opens, closes = SERVICE_HOURS[day.weekday()]
+    slot = datetime.combine(day, time(opens))
+    last = datetime.combine(day, time(closes))
+    slots = []
+    while slot < last:
+        slots.append(slot)
+        slot += timedelta(minutes=SLOT_MINUTES)
+    return slots
+
+
+def load_day_counts(day):
+    """Count reservations per time slot for a date with one grouped query"""
+    start = datetime.combine(day, time.min)
+    rows = db.session.execute(
+        select(Reservation.time_slot, func.count(Reservation.id))
+        .where(Reservation.time_slot >= start, Reservation.time_slot < start + timedelta(days=1))
+        .group_by(Reservation.time_slot)
+    )
+    return dict(rows.all())
+
+
+def day_availability(day):
+    """Return (time_slot, tables_remaining) for every slot of a date"""
+    counts = day_cache.get(day)
+    if counts is None:
+        stamp = day_cache.stamp(day)
+        counts = load_day_counts(day)
+        day_cache.set(day, counts, stamp)
+    slots = sorted(set(service_slots(day)) | set(counts))
+    return [(slot, max(TABLE_COUNT - counts.get(slot, 0), 0)) for slot in slots]
+
+
+def book_table(customer_id, time_slot, number_of_guests):
+    """Insert a reservation on a free table, or return None if the slot is full.
+
+    The cached bitmap may be stale, so a table it reports as free is not
+    re-checked here: the unique (time_slot, table_number) constraint is what
+    prevents double booking. If another request or worker took the chosen
+    table, the insert fails and we re-read the slot and pick again; a slot the
+    cache reports as full is re-read once before giving up. Every conflict means
+    one more table is known to be taken, so the loop is bounded by the number
+    of tables.
+    """
+    mask = taken_mask(time_slot)
+    refreshed = False
+    for _ in range(TABLE_COUNT + 2):
+        table_number = pick_free_table(mask)
+        if table_number is None:
+            if refreshed:
+                return None
+            mask = taken_mask(time_slot, refresh=True)
+            refreshed = True
+            continue
+
+        reservation = Reservation(
+            customer_id=customer_id,
+            time_slot=time_slot,
+            table_number=table_number,
+            number_of_guests=number_of_guests
+        )
+        db.session.add(reservation)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            mask = taken_mask(time_slot, refresh=True) | table_bit(table_number)
+            refreshed = True
+            continue
+
+        mark_taken(time_slot, table_number)
+        return reservation
+    raise RuntimeError(f'Could not assign a table for {time_slot}')
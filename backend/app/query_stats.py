@@ -0,0 +1,84 @@
+"""
+Per-request SQL statistics and the slow-query log
+
+Every statement is timed from the engine's cursor events. Inside a request
+the count and total time are kept on ``g`` and reported in a
+``Server-Timing`` header; statements slower than ``SLOW_QUERY_MS`` are logged
+with their bind parameters replaced by type names.
+"""
+
+import logging
+import time
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def server_timing(self):
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+def redact(parameters):
+    """Bind parameters with every value replaced by its type name"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f'{len(parameters)} parameter sets'  # executemany
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def init_app(app):
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def add_server_timing(response):
+        stats = g.get('query_stats')
+        if stats is not None and app.config.get('SERVER_TIMING', True):
+            response.headers.add('Server-Timing', stats.server_timing())
+        return response
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    metrics.query_finished(elapsed)
+    if not has_app_context():
+        return
+    stats = g.get('query_stats')
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+    threshold = current_app.config.get('SLOW_QUERY_MS')
+    if threshold and elapsed * 1000 >= threshold:
+        logger.warning('Slow query (%.1f ms): %s', elapsed * 1000, statement, extra={
+            'duration_ms': round(elapsed * 1000, 2),
+            'parameters': redact(parameters),
+        })
+
+
+@event.listens_for(Engine, 'handle_error')
+def _discard_query_timer(context):
+    timers = context.connection.info.get('query_started') if context.connection else None
+    if timers:
+        timers.pop()
@@ -0,0 +1,152 @@
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(value):
+    """Parse ``"5/minute"`` into (tokens per second, burst size)"""
+    count, _, period = value.partition('/')
+    count = int(count)
+    return count / PERIODS[period.strip().rstrip('s')], count
+
+
+def take_token(tokens, updated, now, rate, burst):
+    """Refill a bucket and try to take one token.
+
+    Returns (tokens, retry_after); retry_after is 0 when the token was taken.
+    """
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBackend:
+    """Buckets in a dict; limits apply per worker process"""
+
+    def __init__(self, app, max_keys=100000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def hit(self, key, rate, burst):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (burst, now))
+            tokens, retry_after = take_token(tokens, updated, now, rate, burst)
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return retry_after
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by every worker on the host.
+
+    Each hit is one short ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers serialize on the bucket update and the limit holds globally.
+    """
+
+    SCHEMA = 'CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+    PRUNE_EVERY = 1000
+
+    def __init__(self, app):
+        self.path = app.config.get('RATELIMIT_STORAGE_PATH') or os.path.join(
+            tempfile.gettempdir(), 'cafe_fausse_ratelimit.db'
+        )
+        self.local = threading.local()
+        self.hits = 0
+        self.connection().execute(self.SCHEMA)
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def hit(self, key, rate, burst):
+        conn = self.connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens, retry_after = take_token(tokens, updated, now, rate, burst)
+            conn.execute(
+                'INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now)
+            )
+            self.hits += 1
+            if self.hits % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM buckets WHERE updated < ?', (now - PERIODS['day'],))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return retry_after
+
+
+class RateLimiter:
+    """Token-bucket rate limits per client IP and endpoint.
+
+    Views opt in with ``@rate_limiter.limit('RATELIMIT_LOGIN')``, naming a
+    config key that holds a rate such as ``"5/minute"``; the bucket holds
+    that many tokens and refills evenly over the period. The store is picked
+    with ``RATELIMIT_BACKEND``:
+
+    - ``memory``: per-process dict (default)
+    - ``sqlite``: a SQLite file shared by all workers on the host
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.rates = {}
+
+    def init_app(self, app):
+        kind = app.config.get('RATELIMIT_BACKEND', 'memory')
+        backends = {'memory': MemoryBackend, 'sqlite': SQLiteBackend}
+        if kind not in backends:
+            raise ValueError(f'Unknown RATELIMIT_BACKEND: {kind}')
+        self.backend = backends[kind](app)
+        self.rates = {}
+        app.extensions['rate_limiter'] = self
+
+    def client_ip(self):
+        proxies = current_app.config.get('RATELIMIT_PROXY_COUNT', 0)
+        if proxies and len(request.access_route) >= proxies:
+            return request.access_route[-proxies]
+        return request.remote_addr
+
+    def rate(self, config_key):
+        rate = self.rates.get(config_key)
+        if rate is None:
+            rate = self.rates[config_key] = parse_rate(current_app.config[config_key])
+        return rate
+
+    def limit(self, config_key):
+        def decorator(f):
+            @wraps(f)
+            def limited(*args, **kwargs):
+                if current_app.config.get('RATELIMIT_ENABLED', True):
+                    rate, burst = self.rate(config_key)
+                    retry_after = self.backend.hit(f'{request.endpoint}:{self.client_ip()}', rate, burst)
+                    if retry_after:
+                        response = jsonify({'error': 'Too many requests. Please try again later.'})
+                        response.headers['Retry-After'] = str(math.ceil(retry_after))
+                        return response, 429
+                return f(*args, **kwargs)
+            return limited
+        return decorator
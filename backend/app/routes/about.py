@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify, request, session
+from app import landing
 from app.models import db, AboutInfo
 
 about_bp = Blueprint('about', __name__)
@@ -9,19 +10,7 @@ def test_about():
 
 @about_bp.route('/info', methods=['GET'])
 def get_about_info():
-    about = AboutInfo.query.first()
-    if not about:
-        return jsonify({'history': '', 'mission': '', 'founders': []}), 200
-    # Founders are static for now, as in SRS
-    founders = [
-        {"name": "Chef Antonio Rossi", "bio": "Award-winning chef with a passion for Italian cuisine and modern techniques."},
-        {"name": "Maria Lopez", "bio": "Restaurateur dedicated to excellent food, unforgettable dining, and locally sourced ingredients."}
-    ]
-    return jsonify({
-        'history': about.history,
-        'mission': about.mission,
-        'founders': founders
-    }), 200
+    return jsonify(landing.about_info()), 200
 
 @about_bp.route('/info', methods=['POST'])
 def create_about_info():
@@ -35,6 +24,7 @@ def create_about_info():
     about = AboutInfo(history=history, mission=mission)
     db.session.add(about)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'About info created.'}), 201
 
 @about_bp.route('/info', methods=['PUT'])
@@ -48,4 +38,5 @@ def update_about_info():
     about.history = data.get('history', about.history)
     about.mission = data.get('mission', about.mission)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'About info updated.'}), 200
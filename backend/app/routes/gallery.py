@@ -1,7 +1,9 @@
 import cloudinary
 import cloudinary.uploader
 import os
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, current_app, jsonify, request, session
+from app import landing
+from app.cache import cached_payload, payload_response
 from app.models import db, GalleryImage, Award, Review
 
 gallery_bp = Blueprint('gallery', __name__)
@@ -10,11 +12,16 @@ gallery_bp = Blueprint('gallery', __name__)
 def test_gallery():
     return {"message": "Gallery endpoint is working!"}, 200
 
+@gallery_bp.route('/landing', methods=['GET'])
+def get_landing():
+    """Gallery images, awards, reviews and about info in one cached response"""
+    payload = cached_payload(landing.landing_cache, landing.LANDING_KEY, landing.load_landing)
+    return payload_response(payload, current_app.config.get('LANDING_CACHE_MAX_AGE', 0))
+
 # --- Gallery Images ---
 @gallery_bp.route('/images', methods=['GET'])
 def get_gallery_images():
-    images = GalleryImage.query.all()
-    return jsonify([{'id': img.id, 'url': img.url, 'caption': img.caption} for img in images]), 200
+    return jsonify(landing.gallery_images()), 200
 
 @gallery_bp.route('/images', methods=['POST'])
 def create_gallery_image():
@@ -28,6 +35,7 @@ def create_gallery_image():
     img = GalleryImage(url=url, caption=caption)
     db.session.add(img)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Image added.', 'id': img.id}), 201
 
 @gallery_bp.route('/images/<int:image_id>', methods=['PUT'])
@@ -41,6 +49,7 @@ def update_gallery_image(image_id):
     img.url = data.get('url', img.url)
     img.caption = data.get('caption', img.caption)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Image updated.'}), 200
 
 @gallery_bp.route('/images/<int:image_id>', methods=['DELETE'])
@@ -52,13 +61,13 @@ def delete_gallery_image(image_id):
         return jsonify({'error': 'Image not found.'}), 404
     db.session.delete(img)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Image deleted.'}), 200
 
 # --- Awards ---
 @gallery_bp.route('/awards', methods=['GET'])
 def get_awards():
-    awards = Award.query.all()
-    return jsonify([{'id': a.id, 'title': a.title, 'year': a.year} for a in awards]), 200
+    return jsonify(landing.awards()), 200
 
 @gallery_bp.route('/awards', methods=['POST'])
 def create_award():
@@ -72,6 +81,7 @@ def create_award():
     award = Award(title=title, year=year)
     db.session.add(award)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Award added.', 'id': award.id}), 201
 
 @gallery_bp.route('/awards/<int:award_id>', methods=['PUT'])
@@ -85,6 +95,7 @@ def update_award(award_id):
     award.title = data.get('title', award.title)
     award.year = data.get('year', award.year)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Award updated.'}), 200
 
 @gallery_bp.route('/awards/<int:award_id>', methods=['DELETE'])
@@ -96,13 +107,13 @@ def delete_award(award_id):
         return jsonify({'error': 'Award not found.'}), 404
     db.session.delete(award)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Award deleted.'}), 200
 
 # --- Reviews ---
 @gallery_bp.route('/reviews', methods=['GET'])
 def get_reviews():
-    reviews = Review.query.all()
-    return jsonify([{'id': r.id, 'review': r.review, 'source': r.source} for r in reviews]), 200
+    return jsonify(landing.reviews()), 200
 
 @gallery_bp.route('/reviews', methods=['POST'])
 def create_review():
@@ -116,6 +127,7 @@ def create_review():
     r = Review(review=review, source=source)
     db.session.add(r)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Review added.', 'id': r.id}), 201
 
 @gallery_bp.route('/reviews/<int:review_id>', methods=['PUT'])
@@ -129,6 +141,7 @@ def update_review(review_id):
     r.review = data.get('review', r.review)
     r.source = data.get('source', r.source)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Review updated.'}), 200
 
 @gallery_bp.route('/reviews/<int:review_id>', methods=['DELETE'])
@@ -140,6 +153,7 @@ def delete_review(review_id):
         return jsonify({'error': 'Review not found.'}), 404
     db.session.delete(r)
     db.session.commit()
+    landing.invalidate()
     return jsonify({'message': 'Review deleted.'}), 200
 
 @gallery_bp.route('/upload', methods=['POST'])
@@ -162,6 +176,7 @@ def upload_gallery_image():
         img = GalleryImage(url=url, caption=caption)
         db.session.add(img)
         db.session.commit()
+        landing.invalidate()
         return jsonify({'message': 'Image uploaded.', 'id': img.id, 'url': url}), 201
     except Exception as e:
         return jsonify({'error': f'Cloudinary upload failed: {e}'}), 500
@@ -1,27 +1,42 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, current_app, jsonify, request, session
+from sqlalchemy import select
+from app.cache import TTLCache, cached_payload, payload_response
 from app.models import db, MenuItem
 
 menu_bp = Blueprint('menu', __name__)
 
+# The grouped menu, serialized once and dropped whenever an item changes
+MENU_KEY = 'items'
+menu_cache = TTLCache(maxsize=1, ttl=300)
+
+@menu_bp.record
+def configure_menu_cache(state):
+    menu_cache.ttl = state.app.config.get('MENU_CACHE_TTL', menu_cache.ttl)
+    menu_cache.clear()
+
+def load_menu():
+    """Group all menu items by category"""
+    rows = db.session.execute(
+        select(MenuItem.id, MenuItem.name, MenuItem.description, MenuItem.price, MenuItem.category)
+    )
+    menu = {}
+    for item_id, name, description, price, category in rows:
+        menu.setdefault(category, []).append({
+            'id': item_id,
+            'name': name,
+            'description': description,
+            'price': price
+        })
+    return menu
+
 @menu_bp.route('/', methods=['GET'])
 def test_menu():
     return {"message": "Menu endpoint is working!"}, 200
 
 @menu_bp.route('/items', methods=['GET'])
 def get_menu_items():
-    items = MenuItem.query.all()
-    menu = {}
-    for item in items:
-        cat = item.category
-        if cat not in menu:
-            menu[cat] = []
-        menu[cat].append({
-            'id': item.id,
-            'name': item.name,
-            'description': item.description,
-            'price': item.price
-        })
-    return jsonify(menu), 200
+    payload = cached_payload(menu_cache, MENU_KEY, load_menu)
+    return payload_response(payload, current_app.config.get('MENU_CACHE_MAX_AGE', 0))
 
 @menu_bp.route('/items/<int:item_id>', methods=['GET'])
 def get_menu_item(item_id):
@@ -50,6 +65,7 @@ def create_menu_item():
     item = MenuItem(name=name, description=description, price=price, category=category)
     db.session.add(item)
     db.session.commit()
+    menu_cache.pop(MENU_KEY)
     return jsonify({'message': 'Menu item created.', 'id': item.id}), 201
 
 @menu_bp.route('/items/<int:item_id>', methods=['PUT'])
@@ -65,6 +81,7 @@ def update_menu_item(item_id):
     item.price = data.get('price', item.price)
     item.category = data.get('category', item.category)
     db.session.commit()
+    menu_cache.pop(MENU_KEY)
     return jsonify({'message': 'Menu item updated.'}), 200
 
 @menu_bp.route('/items/<int:item_id>', methods=['DELETE'])
@@ -76,4 +93,5 @@ def delete_menu_item(item_id):
         return jsonify({'error': 'Menu item not found.'}), 404
     db.session.delete(item)
     db.session.commit()
+    menu_cache.pop(MENU_KEY)
     return jsonify({'message': 'Menu item deleted.'}), 200
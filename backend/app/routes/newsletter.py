@@ -1,10 +1,16 @@
-from flask import Blueprint, request, jsonify, session, Response
-from app.models import db, Newsletter
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context, current_app
+from sqlalchemy import select
+from app.models import db, Newsletter, NewsletterCampaign
 from datetime import datetime
-import re
-from flask_mail import Message
-from app import mail
+from app import email_queue, email_templates, rate_limiter, smtp_pool
 from app.auth import require_admin
+from app.utils import iter_csv
+from app.campaigns import campaign_progress, start_campaign
+from app.schemas import select_dicts
+from app.subscribers import EMAIL_RE, import_subscribers, iter_upload_emails
+import logging
+
+logger = logging.getLogger(__name__)
 
 newsletter_bp = Blueprint('newsletter', __name__)
 
@@ -12,55 +18,16 @@ newsletter_bp = Blueprint('newsletter', __name__)
 def simple_test():
     return {"message": "Simple test route working!"}, 200
 
+@email_queue.task('newsletter_welcome')
 def send_welcome_email(email):
     """Send welcome email to new newsletter subscribers"""
     try:
-        subject = "Welcome to Café Fausse Newsletter!"
-        
-        body = f"""
-Welcome to the Café Fausse family!
-
-Thank you for subscribing to our newsletter. You'll be the first to know about:
-
-• Special events and promotions
-• New menu items and seasonal dishes
-• Exclusive dining experiences
-• Behind-the-scenes stories from our kitchen
-
-We're excited to share our passion for exceptional dining with you!
-
-Best regards,
-The Café Fausse Team
-        """
-        
-        html_body = f"""
-        <html>
-        <body>
-            <h2>Welcome to the Café Fausse Family!</h2>
-            <p>Thank you for subscribing to our newsletter. You'll be the first to know about:</p>
-            <ul>
-                <li>Special events and promotions</li>
-                <li>New menu items and seasonal dishes</li>
-                <li>Exclusive dining experiences</li>
-                <li>Behind-the-scenes stories from our kitchen</li>
-            </ul>
-            <p>We're excited to share our passion for exceptional dining with you!</p>
-            <p>Best regards,<br>The Café Fausse Team</p>
-        </body>
-        </html>
-        """
-        
-        msg = Message(
-            subject=subject,
-            recipients=[email],
-            body=body,
-            html=html_body
-        )
-        mail.send(msg)
-        print(f"✅ Welcome email sent successfully to: {email}")
+        msg = email_templates.message('newsletter_welcome', [email])
+        smtp_pool.send(msg)
+        logger.info('Welcome email sent to %s', email)
         return True
     except Exception as e:
-        print(f"❌ Failed to send welcome email: {e}")
+        logger.warning('Failed to send welcome email: %s', e)
         return False
 
 @newsletter_bp.route('/test-db', methods=['GET'])
@@ -121,17 +88,17 @@ def test_newsletter():
     return {"message": "Newsletter endpoint is working!"}, 200
 
 @newsletter_bp.route('/', methods=['POST'])
+@rate_limiter.limit('RATELIMIT_NEWSLETTER')
 def signup_newsletter():
     try:
         data = request.get_json()
-        print(f"Received newsletter signup data: {data}")
+        logger.debug('Received newsletter signup data: %s', data)
         
         email = data.get('email')
         if not email:
             return jsonify({'error': 'Email is required.'}), 400
             
-        email_regex = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-        if not re.match(email_regex, email):
+        if not EMAIL_RE.match(email):
             return jsonify({'error': 'Invalid email format.'}), 400
             
         # Check if email already exists
@@ -144,45 +111,124 @@ def signup_newsletter():
         db.session.add(newsletter)
         db.session.commit()
         
-        print(f"✅ Newsletter signup successful for: {email}")
+        logger.info('Newsletter signup for %s', email)
         
-        # Send welcome email
-        try:
-            send_welcome_email(email)
-        except Exception as email_error:
-            print(f"⚠️ Email sending failed but signup succeeded: {email_error}")
-            # Don't fail the signup if email fails
+        # Queue welcome email; a delivery failure doesn't fail the signup
+        email_queue.enqueue('newsletter_welcome', email)
         
         return jsonify({'message': 'Signed up for newsletter successfully.'}), 201
         
     except Exception as e:
-        print(f"❌ Newsletter signup error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Newsletter signup failed')
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 @newsletter_bp.route('/all', methods=['GET'])
 @require_admin
 def get_all_newsletter_signups():
-    signups = Newsletter.query.all()
-    return jsonify([
-        {'id': n.id, 'email': n.email, 'signup_date': n.signup_date.isoformat() if n.signup_date else None}
-        for n in signups
-    ]), 200
+    return jsonify(select_dicts(Newsletter.id, Newsletter.email, Newsletter.signup_date)), 200
 
 @newsletter_bp.route('/export', methods=['GET'])
 @require_admin
 def export_newsletter_csv():
-    signups = Newsletter.query.all()
-    csv_data = 'id,email,signup_date\n'
-    for n in signups:
-        csv_data += f'{n.id},{n.email},{n.signup_date.isoformat() if n.signup_date else ""}\n'
+    rows = db.session.execute(
+        select(Newsletter.id, Newsletter.email, Newsletter.signup_date)
+        .order_by(Newsletter.id)
+        .execution_options(yield_per=1000)
+    )
+    records = (
+        (n_id, email, signup_date.isoformat() if signup_date else '')
+        for n_id, email, signup_date in rows
+    )
     return Response(
-        csv_data,
+        stream_with_context(iter_csv(['id', 'email', 'signup_date'], records)),
         mimetype='text/csv',
         headers={'Content-Disposition': 'attachment;filename=newsletter_signups.csv'}
     )
 
+@newsletter_bp.route('/import', methods=['POST'])
+@require_admin
+def import_newsletter_subscribers():
+    """Bulk-import subscribers from a CSV or NDJSON upload"""
+    try:
+        upload = request.files.get('file')
+        if upload:
+            stream, mimetype = upload.stream, upload.mimetype
+        else:
+            stream, mimetype = request.stream, request.mimetype
+        if request.args.get('format') == 'ndjson':
+            mimetype = 'application/x-ndjson'
+        elif request.args.get('format') == 'csv':
+            mimetype = 'text/csv'
+
+        counts = import_subscribers(
+            iter_upload_emails(stream, mimetype),
+            batch_size=current_app.config.get('NEWSLETTER_IMPORT_BATCH_SIZE', 1000)
+        )
+        return jsonify({'message': 'Import finished.', **counts}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Import failed: {str(e)}'}), 500
+
+def campaign_to_dict(campaign):
+    return {
+        'id': campaign.id,
+        'subject': campaign.subject,
+        'status': campaign.status,
+        'created_at': campaign.created_at.isoformat(),
+        'started_at': campaign.started_at.isoformat() if campaign.started_at else None,
+        'finished_at': campaign.finished_at.isoformat() if campaign.finished_at else None,
+        **campaign_progress(campaign.id)
+    }
+
+@newsletter_bp.route('/campaigns', methods=['POST'])
+@require_admin
+def create_campaign():
+    """Create a campaign and start mailing every subscriber in the background"""
+    data = request.get_json() or {}
+    subject = data.get('subject')
+    body_text = data.get('body_text')
+    if not subject or not body_text:
+        return jsonify({'error': 'subject and body_text are required.'}), 400
+    campaign = NewsletterCampaign(
+        subject=subject,
+        body_text=body_text,
+        body_html=data.get('body_html'),
+        status='queued',
+        created_at=datetime.now()
+    )
+    db.session.add(campaign)
+    db.session.commit()
+    start_campaign(campaign.id)
+    return jsonify({'message': 'Campaign queued.', 'campaign': campaign_to_dict(campaign)}), 202
+
+@newsletter_bp.route('/campaigns', methods=['GET'])
+@require_admin
+def list_campaigns():
+    campaigns = NewsletterCampaign.query.order_by(NewsletterCampaign.id.desc()).all()
+    return jsonify([campaign_to_dict(c) for c in campaigns]), 200
+
+@newsletter_bp.route('/campaigns/<int:campaign_id>', methods=['GET'])
+@require_admin
+def get_campaign(campaign_id):
+    campaign = db.session.get(NewsletterCampaign, campaign_id)
+    if not campaign:
+        return jsonify({'error': 'Campaign not found.'}), 404
+    return jsonify({**campaign_to_dict(campaign), 'subscribers': Newsletter.query.count()}), 200
+
+@newsletter_bp.route('/campaigns/<int:campaign_id>/resume', methods=['POST'])
+@require_admin
+def resume_campaign(campaign_id):
+    """Restart an interrupted campaign from the last recorded recipient"""
+    campaign = db.session.get(NewsletterCampaign, campaign_id)
+    if not campaign:
+        return jsonify({'error': 'Campaign not found.'}), 404
+    if campaign.status == 'completed':
+        return jsonify({'error': 'Campaign already completed.'}), 409
+    if campaign.status == 'sending' and campaign.lease_until and campaign.lease_until > datetime.now():
+        return jsonify({'error': 'Campaign is already sending.'}), 409
+    start_campaign(campaign.id)
+    return jsonify({'message': 'Campaign resumed.'}), 202
+
 @newsletter_bp.route('/migrate-db', methods=['GET'])
 @require_admin
 def migrate_database():
@@ -219,9 +265,9 @@ def migrate_database_public():
         try:
             db.session.execute(text('DROP TABLE IF EXISTS admin CASCADE'))
             db.session.commit()
-            print("✅ Dropped existing admin table")
+            logger.info('Dropped existing admin table')
         except Exception as e:
-            print(f"⚠️ Error dropping admin table: {e}")
+            logger.warning('Error dropping admin table: %s', e)
         
         # Create all tables
         db.create_all()
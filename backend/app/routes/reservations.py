@@ -1,239 +1,159 @@
-from flask import Blueprint, request, jsonify, session, Response
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context
 from app.models import db, Customer, Reservation
-from datetime import datetime
-import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+import base64
 import re
-from flask_mail import Message
-from app import mail
+from app import email_queue, email_templates, rate_limiter, smtp_pool
 from app.auth import require_admin
+from app import occupancy
+from app.schemas import RESERVATION_COLUMNS, RESERVATION_FIELDS, booking_schema, reservation_schema, rows_to_dicts
+from app.utils import iter_csv
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 reservations_bp = Blueprint('reservations', __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+@email_queue.task('reservation_confirmation')
 def send_reservation_confirmation_email(reservation_data):
     """Send reservation confirmation email to customer"""
     try:
-        subject = f"Reservation Confirmed - Café Fausse"
-        
-        # Parse datetime
-        time_slot = reservation_data.get('time_slot')
-        if time_slot:
-            try:
-                dt = datetime.fromisoformat(time_slot.replace('Z', '+00:00'))
-                formatted_time = dt.strftime('%B %d, %Y at %I:%M %p')
-            except:
-                formatted_time = time_slot
-        else:
-            formatted_time = "TBD"
-        
-        # Plain text version
-        body = f"""
-Dear {reservation_data.get('customer_name', 'Valued Customer')},
-
-Your reservation has been confirmed!
-
-Reservation Details:
-- Date & Time: {formatted_time}
-- Number of Guests: {reservation_data.get('number_of_guests')}
-- Table Number: {reservation_data.get('table_number')}
-- Reservation ID: {reservation_data.get('id')}
-
-We look forward to serving you at Café Fausse!
-
-Best regards,
-The Café Fausse Team
-        """
-        
-        # HTML version
-        html_body = f"""
-        <html>
-        <body>
-            <h2>Reservation Confirmed - Café Fausse</h2>
-            <p>Dear {reservation_data.get('customer_name', 'Valued Customer')},</p>
-            <p>Your reservation has been confirmed!</p>
-            <h3>Reservation Details:</h3>
-            <ul>
-                <li><strong>Date & Time:</strong> {formatted_time}</li>
-                <li><strong>Number of Guests:</strong> {reservation_data.get('number_of_guests')}</li>
-                <li><strong>Table Number:</strong> {reservation_data.get('table_number')}</li>
-                <li><strong>Reservation ID:</strong> {reservation_data.get('id')}</li>
-            </ul>
-            <p>We look forward to serving you at Café Fausse!</p>
-            <p>Best regards,<br>The Café Fausse Team</p>
-        </body>
-        </html>
-        """
-        
-        msg = Message(
-            subject=subject,
-            recipients=[reservation_data['email']],
-            body=body,
-            html=html_body
-        )
-        mail.send(msg)
-        print(f"✅ Reservation confirmation email sent to: {reservation_data['email']}")
+        msg = email_templates.message('reservation_confirmation', [reservation_data['email']], reservation=reservation_data)
+        smtp_pool.send(msg)
+        logger.info('Reservation confirmation email sent to %s', reservation_data['email'])
         return True
     except Exception as e:
-        print(f"❌ Failed to send reservation confirmation email: {e}")
+        logger.warning('Failed to send reservation confirmation email: %s', e)
         return False
 
+@email_queue.task('admin_notification')
 def send_admin_notification_email(reservation_data):
     """Send notification email to admin about new reservation"""
     try:
         admin_email = os.getenv('ADMIN_EMAIL')
         if not admin_email:
-            print("❌ ADMIN_EMAIL environment variable not configured")
+            logger.error('ADMIN_EMAIL environment variable not configured')
             return False
         
-        # Parse datetime
-        time_slot = reservation_data.get('time_slot')
-        if time_slot:
-            try:
-                dt = datetime.fromisoformat(time_slot.replace('Z', '+00:00'))
-                formatted_time = dt.strftime('%B %d, %Y at %I:%M %p')
-            except:
-                formatted_time = time_slot
-        else:
-            formatted_time = "TBD"
-        
-        subject = f"New Reservation - {reservation_data.get('customer_name', 'Customer')}"
-        
-        body = f"""
-New reservation received:
-
-Customer: {reservation_data.get('customer_name')}
-Email: {reservation_data.get('email')}
-Phone: {reservation_data.get('phone')}
-Date & Time: {formatted_time}
-Number of Guests: {reservation_data.get('number_of_guests')}
-Table Number: {reservation_data.get('table_number')}
-Reservation ID: {reservation_data.get('id')}
-
-Please review and confirm.
-        """
-        
-        html_body = f"""
-        <html>
-        <body>
-            <h2>New Reservation Received</h2>
-            <table>
-                <tr><td><strong>Customer:</strong></td><td>{reservation_data.get('customer_name')}</td></tr>
-                <tr><td><strong>Email:</strong></td><td>{reservation_data.get('email')}</td></tr>
-                <tr><td><strong>Phone:</strong></td><td>{reservation_data.get('phone')}</td></tr>
-                <tr><td><strong>Date & Time:</strong></td><td>{formatted_time}</td></tr>
-                <tr><td><strong>Number of Guests:</strong></td><td>{reservation_data.get('number_of_guests')}</td></tr>
-                <tr><td><strong>Table Number:</strong></td><td>{reservation_data.get('table_number')}</td></tr>
-                <tr><td><strong>Reservation ID:</strong></td><td>{reservation_data.get('id')}</td></tr>
-            </table>
-            <p>Please review and confirm.</p>
-        </body>
-        </html>
-        """
-        
-        msg = Message(
-            subject=subject,
-            recipients=[admin_email],
-            body=body,
-            html=html_body
-        )
-        mail.send(msg)
-        print(f"✅ Admin notification email sent to: {admin_email}")
+        msg = email_templates.message('admin_notification', [admin_email], reservation=reservation_data)
+        smtp_pool.send(msg)
+        logger.info('Admin notification email sent to %s', admin_email)
         return True
     except Exception as e:
-        print(f"❌ Failed to send admin notification email: {e}")
+        logger.warning('Failed to send admin notification email: %s', e)
         return False
 
+@email_queue.task('reservation_cancellation')
 def send_reservation_cancellation_email(reservation_data):
     """Send reservation cancellation email to customer"""
     try:
-        subject = f"Reservation Cancelled - Café Fausse"
-        
-        # Parse datetime
-        time_slot = reservation_data.get('time_slot')
-        if time_slot:
-            try:
-                dt = datetime.fromisoformat(time_slot.replace('Z', '+00:00'))
-                formatted_time = dt.strftime('%B %d, %Y at %I:%M %p')
-            except:
-                formatted_time = time_slot
-        else:
-            formatted_time = "TBD"
-        
-        body = f"""
-Dear {reservation_data.get('customer_name', 'Valued Customer')},
-
-Your reservation has been cancelled.
-
-Cancelled Reservation Details:
-- Date & Time: {formatted_time}
-- Number of Guests: {reservation_data.get('number_of_guests')}
-- Table Number: {reservation_data.get('table_number')}
-- Reservation ID: {reservation_data.get('id')}
-
-If you have any questions, please contact us at (202) 555-4567.
-
-We hope to see you again soon!
-
-Best regards,
-The Café Fausse Team
-        """
-        
-        html_body = f"""
-        <html>
-        <body>
-            <h2>Reservation Cancelled - Café Fausse</h2>
-            <p>Dear {reservation_data.get('customer_name', 'Valued Customer')},</p>
-            <p>Your reservation has been cancelled.</p>
-            <h3>Cancelled Reservation Details:</h3>
-            <ul>
-                <li><strong>Date & Time:</strong> {formatted_time}</li>
-                <li><strong>Number of Guests:</strong> {reservation_data.get('number_of_guests')}</li>
-                <li><strong>Table Number:</strong> {reservation_data.get('table_number')}</li>
-                <li><strong>Reservation ID:</strong> {reservation_data.get('id')}</li>
-            </ul>
-            <p>If you have any questions, please contact us at (202) 555-4567.</p>
-            <p>We hope to see you again soon!</p>
-            <p>Best regards,<br>The Café Fausse Team</p>
-        </body>
-        </html>
-        """
-        
-        msg = Message(
-            subject=subject,
-            recipients=[reservation_data['email']],
-            body=body,
-            html=html_body
-        )
-        mail.send(msg)
-        print(f"✅ Reservation cancellation email sent to: {reservation_data['email']}")
+        msg = email_templates.message('reservation_cancellation', [reservation_data['email']], reservation=reservation_data)
+        smtp_pool.send(msg)
+        logger.info('Reservation cancellation email sent to %s', reservation_data['email'])
         return True
     except Exception as e:
-        print(f"❌ Failed to send cancellation email: {e}")
+        logger.warning('Failed to send cancellation email: %s', e)
         return False
 
 @reservations_bp.route('/', methods=['GET'])
 def test_reservations():
     return {"message": "Reservations endpoint is working!"}, 200
 
+def encode_cursor(reservation):
+    """Opaque keyset cursor for the (time_slot, id) position of a reservation row"""
+    raw = f"{reservation['time_slot'].isoformat()}|{reservation['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    time_slot, reservation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(time_slot), int(reservation_id)
+
 @reservations_bp.route('/all', methods=['GET'])
 @require_admin
 def get_all_reservations():
-    reservations = Reservation.query.all()
-    result = []
-    for r in reservations:
-        customer = Customer.query.get(r.customer_id)
-        result.append({
-            'id': r.id,
-            'customer_name': customer.name if customer else None,
-            'email': customer.email if customer else None,
-            'phone': customer.phone if customer else None,
-            'time_slot': r.time_slot.isoformat(),
-            'table_number': r.table_number,
-            'number_of_guests': r.number_of_guests
-        })
-    return jsonify({'reservations': result}), 200
+    """List reservations ordered by (time_slot, id), one keyset page at a time"""
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    try:
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        date_from = date.fromisoformat(date_from) if date_from else None
+        date_to = date.fromisoformat(date_to) if date_to else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    query = select(*RESERVATION_COLUMNS).outerjoin(Customer, Reservation.customer_id == Customer.id)
+    if date_from:
+        query = query.filter(Reservation.time_slot >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        query = query.filter(Reservation.time_slot < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    party_size = request.args.get('party_size', type=int)
+    if party_size is not None:
+        query = query.filter(Reservation.number_of_guests == party_size)
+    table_number = request.args.get('table_number', type=int)
+    if table_number is not None:
+        query = query.filter(Reservation.table_number == table_number)
+    search = request.args.get('search', '').strip()
+    if search:
+        matches = [
+            Customer.name.icontains(search, autoescape=True),
+            Customer.email.icontains(search, autoescape=True),
+            Customer.phone.icontains(search, autoescape=True),
+        ]
+        if search.isdecimal():
+            matches.append(Reservation.id == int(search))
+        query = query.filter(or_(*matches))
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after_slot, after_id = decode_cursor(cursor)
+        except Exception:
+            return jsonify({'error': 'Invalid cursor.'}), 400
+        query = query.filter(or_(
+            Reservation.time_slot > after_slot,
+            and_(Reservation.time_slot == after_slot, Reservation.id > after_id)
+        ))
+
+    rows = db.session.execute(query.order_by(Reservation.time_slot, Reservation.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    reservations = rows_to_dicts(rows[:limit], RESERVATION_FIELDS)
+    return jsonify({
+        'reservations': reservations,
+        'next_cursor': encode_cursor(reservations[-1]) if has_more else None
+    }), 200
+
+@reservations_bp.route('/availability', methods=['GET'])
+def get_availability():
+    """Remaining tables for every time slot of a date.
+
+    Tables have no seat count, so any free table fits any party and the
+    availability of a slot doesn't depend on party size.
+    """
+    try:
+        day = date.fromisoformat(request.args.get('date', ''))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    now = datetime.now()
+    slots = [
+        {
+            'time_slot': slot.isoformat(),
+            'tables_remaining': remaining,
+            'available': remaining > 0 and slot > now
+        }
+        for slot, remaining in occupancy.day_availability(day)
+    ]
+    return jsonify({'date': day.isoformat(), 'slots': slots}), 200
 
 @reservations_bp.route('/', methods=['POST'])
+@rate_limiter.limit('RATELIMIT_RESERVATIONS')
 def create_reservation():
     try:
         data = request.get_json()
@@ -263,59 +183,31 @@ def create_reservation():
         if not customer:
             customer = Customer(name=customer_name, email=email, phone=phone)
             db.session.add(customer)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # A parallel booking created this customer first
+                db.session.rollback()
+                customer = Customer.query.filter_by(email=email).first()
 
-        # Check how many reservations exist for this time slot
-        reservations = Reservation.query.filter_by(time_slot=time_slot_dt).all()
-        taken_tables = {r.table_number for r in reservations}
-        if len(taken_tables) >= 30:
+        # Assign a random available table, retrying if another request wins it
+        reservation = occupancy.book_table(customer.id, time_slot_dt, number_of_guests)
+        if reservation is None:
             return jsonify({'error': 'Time slot is fully booked.'}), 409
 
-        # Assign a random available table
-        available_tables = set(range(1, 31)) - taken_tables
-        table_number = random.choice(list(available_tables))
-
-        reservation = Reservation(
-            customer_id=customer.id,
-            time_slot=time_slot_dt,
-            table_number=table_number,
-            number_of_guests=number_of_guests
-        )
-        db.session.add(reservation)
-        db.session.commit()
-
         # Prepare email data
-        email_data = {
-            'id': reservation.id,
-            'customer_name': customer.name,
-            'email': customer.email,
-            'phone': customer.phone,
-            'time_slot': reservation.time_slot.isoformat(),
-            'table_number': reservation.table_number,
-            'number_of_guests': reservation.number_of_guests
-        }
-        
-        # Send confirmation email to customer
-        print(f"Attempting to send confirmation email to: {customer.email}")
-        send_reservation_confirmation_email(email_data)
+        email_data = reservation_schema.dump(reservation)
         
-        # Send notification to admin
-        print(f"Attempting to send admin notification")
-        send_admin_notification_email(email_data)
+        # Queue confirmation email to customer and notification to admin
+        email_queue.enqueue('reservation_confirmation', email_data)
+        email_queue.enqueue('admin_notification', email_data)
 
         return jsonify({
             'message': 'Reservation successful.',
-            'reservation': {
-                'id': reservation.id,
-                'customer_name': customer.name,
-                'email': customer.email,
-                'time_slot': reservation.time_slot.isoformat(),
-                'table_number': reservation.table_number,
-                'number_of_guests': reservation.number_of_guests
-            }
+            'reservation': booking_schema.dump(reservation)
         }), 201
-    except Exception as e:
-        print(f"❌ Reservation creation error: {e}")
+    except Exception:
+        logger.exception('Reservation creation failed')
         return jsonify({'error': 'Internal server error'}), 500
 
 @reservations_bp.route('/<int:reservation_id>', methods=['PUT'])
@@ -326,6 +218,7 @@ def update_reservation(reservation_id):
         return jsonify({'error': 'Reservation not found.'}), 404
     
     data = request.get_json()
+    previous_slot = reservation.time_slot
     if 'time_slot' in data:
         try:
             reservation.time_slot = datetime.fromisoformat(data['time_slot'])
@@ -336,7 +229,13 @@ def update_reservation(reservation_id):
     if 'number_of_guests' in data:
         reservation.number_of_guests = data['number_of_guests']
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Table is already booked for this time slot.'}), 409
+    occupancy.invalidate_slot(previous_slot)
+    occupancy.invalidate_slot(reservation.time_slot)
     return jsonify({'message': 'Reservation updated successfully.'}), 200
 
 @reservations_bp.route('/<int:reservation_id>', methods=['DELETE'])
@@ -346,20 +245,29 @@ def delete_reservation(reservation_id):
     if not reservation:
         return jsonify({'error': 'Reservation not found.'}), 404
     
+    time_slot, table_number = reservation.time_slot, reservation.table_number
     db.session.delete(reservation)
     db.session.commit()
+    occupancy.mark_free(time_slot, table_number)
     return jsonify({'message': 'Reservation deleted successfully.'}), 200
 
 @reservations_bp.route('/export', methods=['GET'])
 @require_admin
 def export_reservations_csv():
-    reservations = Reservation.query.all()
-    csv_data = 'id,customer_name,email,phone,time_slot,table_number,number_of_guests\n'
-    for r in reservations:
-        customer = Customer.query.get(r.customer_id)
-        csv_data += f'{r.id},{customer.name if customer else ""},{customer.email if customer else ""},{customer.phone if customer else ""},{r.time_slot.isoformat()},{r.table_number},{r.number_of_guests}\n'
+    """Stream all reservations as CSV without loading them into memory"""
+    rows = db.session.execute(
+        select(*RESERVATION_COLUMNS)
+        .outerjoin(Customer, Reservation.customer_id == Customer.id)
+        .order_by(Reservation.id)
+        .execution_options(yield_per=1000)
+    )
+    header = RESERVATION_FIELDS
+    records = (
+        (r_id, name, email, phone, time_slot.isoformat(), table_number, guests)
+        for r_id, name, email, phone, time_slot, table_number, guests in rows
+    )
     return Response(
-        csv_data,
+        stream_with_context(iter_csv(header, records)),
         mimetype='text/csv',
         headers={'Content-Disposition': 'attachment;filename=reservations.csv'}
     )
@@ -370,21 +278,13 @@ def customer_lookup_reservation():
     reservation_id = request.args.get('reservation_id')
     if not email or not reservation_id:
         return jsonify({'error': 'Email and reservation_id required.'}), 400
-    reservation = Reservation.query.get(reservation_id)
+    reservation = db.session.get(Reservation, reservation_id, options=[joinedload(Reservation.customer)])
     if not reservation:
         return jsonify({'error': 'Reservation not found.'}), 404
-    customer = Customer.query.get(reservation.customer_id)
+    customer = reservation.customer
     if not customer or customer.email != email:
         return jsonify({'error': 'Reservation not found for this email.'}), 404
-    return jsonify({
-        'id': reservation.id,
-        'customer_name': customer.name,
-        'email': customer.email,
-        'phone': customer.phone,
-        'time_slot': reservation.time_slot.isoformat(),
-        'table_number': reservation.table_number,
-        'number_of_guests': reservation.number_of_guests
-    }), 200
+    return jsonify(reservation_schema.dump(reservation)), 200
 
 @reservations_bp.route('/lookup', methods=['DELETE'])
 def customer_cancel_reservation():
@@ -394,32 +294,25 @@ def customer_cancel_reservation():
         reservation_id = data.get('reservation_id')
         if not email or not reservation_id:
             return jsonify({'error': 'Email and reservation_id required.'}), 400
-        reservation = Reservation.query.get(reservation_id)
+        reservation = db.session.get(Reservation, reservation_id, options=[joinedload(Reservation.customer)])
         if not reservation:
             return jsonify({'error': 'Reservation not found.'}), 404
-        customer = Customer.query.get(reservation.customer_id)
+        customer = reservation.customer
         if not customer or customer.email != email:
             return jsonify({'error': 'Reservation not found for this email.'}), 404
         
         # Store reservation data before deletion for email
-        reservation_data = {
-            'id': reservation.id,
-            'customer_name': customer.name,
-            'email': customer.email,
-            'phone': customer.phone,
-            'time_slot': reservation.time_slot.isoformat(),
-            'table_number': reservation.table_number,
-            'number_of_guests': reservation.number_of_guests
-        }
+        reservation_data = reservation_schema.dump(reservation)
         
+        time_slot, table_number = reservation.time_slot, reservation.table_number
         db.session.delete(reservation)
         db.session.commit()
+        occupancy.mark_free(time_slot, table_number)
         
-        # Send cancellation email
-        print(f"Attempting to send cancellation email to: {customer.email}")
-        send_reservation_cancellation_email(reservation_data)
+        # Queue cancellation email
+        email_queue.enqueue('reservation_cancellation', reservation_data)
         
         return jsonify({'message': 'Reservation cancelled.'}), 200
-    except Exception as e:
-        print(f"❌ Reservation cancellation error: {e}")
+    except Exception:
+        logger.exception('Reservation cancellation failed')
         return jsonify({'error': 'Internal server error'}), 500
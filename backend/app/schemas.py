@@ -0,0 +1,55 @@
+"""
+Serializers shared by the routes
+
+Single objects go through marshmallow schemas. Lists are read as column
+tuples and turned into dicts by ``rows_to_dicts``, which skips building
+ORM instances and the session's identity map entirely; datetimes are left
+for the JSON provider to write as ISO 8601.
+"""
+
+from marshmallow import Schema, fields
+from sqlalchemy import select
+
+from app import db
+from app.models import Customer, Reservation
+
+
+class ReservationSchema(Schema):
+    """A reservation with its customer's contact details flattened in"""
+
+    id = fields.Integer()
+    customer_name = fields.String(attribute='customer.name')
+    email = fields.String(attribute='customer.email')
+    phone = fields.String(attribute='customer.phone', allow_none=True)
+    time_slot = fields.DateTime()
+    table_number = fields.Integer()
+    number_of_guests = fields.Integer()
+
+
+reservation_schema = ReservationSchema()
+# The booking response doesn't echo the phone number back
+booking_schema = ReservationSchema(exclude=('phone',))
+
+# Columns for the same fields as ReservationSchema, for column-tuple queries.
+# Select from Reservation and outer join Customer on customer_id.
+RESERVATION_COLUMNS = (
+    Reservation.id,
+    Customer.name.label('customer_name'),
+    Customer.email,
+    Customer.phone,
+    Reservation.time_slot,
+    Reservation.table_number,
+    Reservation.number_of_guests,
+)
+RESERVATION_FIELDS = tuple(column.key for column in RESERVATION_COLUMNS)
+
+
+def rows_to_dicts(rows, keys=None):
+    """Convert column-tuple rows to dicts keyed by ``keys`` (default: the result's column names)"""
+    keys = tuple(keys or rows.keys())
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def select_dicts(*columns):
+    """Read just ``columns`` from their table as a list of dicts"""
+    return rows_to_dicts(db.session.execute(select(*columns)))
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models import Newsletter
+
+EMAIL_RE = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+EMAIL_MAX_LENGTH = Newsletter.__table__.c.email.type.length
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json')
+
+
+def is_valid_email(email):
+    return len(email) <= EMAIL_MAX_LENGTH and EMAIL_RE.match(email) is not None
+
+
+def iter_csv_emails(lines):
+    """Yield the email column of a CSV upload (or the first column if there is no header)"""
+    reader = csv.reader(lines)
+    column = 0
+    for row in reader:
+        if not row:
+            continue
+        if reader.line_num == 1:
+            header = [cell.strip().lower() for cell in row]
+            if 'email' in header:
+                column = header.index('email')
+                continue
+        yield row[column].strip() if column < len(row) else ''
+
+
+def iter_ndjson_emails(lines):
+    """Yield emails from NDJSON lines, each either ``"a@b.com"`` or ``{"email": "a@b.com"}``"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield ''
+            continue
+        if isinstance(record, dict):
+            record = record.get('email')
+        yield record.strip() if isinstance(record, str) else ''
+
+
+def iter_upload_emails(stream, mimetype):
+    """Read an uploaded byte stream line by line and yield the raw email of each record"""
+    lines = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    if mimetype in NDJSON_TYPES:
+        return iter_ndjson_emails(lines)
+    return iter_csv_emails(lines)
+
+
+def _insert_ignoring_duplicates(emails, signup_date):
+    """Insert a batch of emails, skipping ones already subscribed; returns the number inserted"""
+    rows = [{'email': email, 'signup_date': signup_date} for email in emails]
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(Newsletter)
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(Newsletter)
+    else:
+        existing = set(db.session.scalars(
+            db.select(Newsletter.email).where(Newsletter.email.in_(emails))
+        ))
+        rows = [row for row in rows if row['email'] not in existing]
+        if rows:
+            db.session.execute(db.insert(Newsletter), rows)
+        return len(rows)
+    stmt = stmt.on_conflict_do_nothing(index_elements=['email']).returning(Newsletter.id)
+    return len(db.session.execute(stmt, rows).all())
+
+
+def import_subscribers(emails, batch_size=1000):
+    """Bulk-subscribe an iterable of emails.
+
+    Addresses are validated, de-duplicated in memory and inserted
+    ``batch_size`` at a time with ``ON CONFLICT DO NOTHING``, so addresses
+    that are already subscribed count as duplicates instead of failing the
+    batch. Imported subscribers are not sent a welcome email.
+    """
+    counts = {'inserted': 0, 'duplicate': 0, 'invalid': 0}
+    seen = set()
+    batch = []
+    signup_date = datetime.now()
+
+    def flush():
+        inserted = _insert_ignoring_duplicates(batch, signup_date)
+        db.session.commit()
+        counts['inserted'] += inserted
+        counts['duplicate'] += len(batch) - inserted
+        batch.clear()
+
+    for email in emails:
+        if not is_valid_email(email):
+            counts['invalid'] += 1
+        elif email in seen:
+            counts['duplicate'] += 1
+        else:
+            seen.add(email)
+            batch.append(email)
+            if len(batch) >= batch_size:
+                flush()
+    if batch:
+        flush()
+    return counts
@@ -0,0 +1,144 @@
+"""
+Helpers for tests and benchmarks
+"""
+
+import socketserver
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sockets.add(self.connection)
+        try:
+            if server.unavailable:
+                self.reply('421 localhost Service not available')
+                return
+            self.reply('220 localhost SMTP stand-in')
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode(errors='replace').strip().upper()
+                if command.startswith(('EHLO', 'HELO')):
+                    self.reply('250 localhost')
+                elif command == 'DATA':
+                    self.reply('354 End data with <CR><LF>.<CR><LF>')
+                    body = []
+                    for data_line in self.rfile:
+                        if data_line == b'.\r\n':
+                            break
+                        body.append(data_line)
+                    with server.lock:
+                        server.messages.append(b''.join(body))
+                    self.reply('250 OK')
+                elif command.startswith('RCPT') and any(address.upper() in command for address in server.refuse):
+                    self.reply('550 No such user')
+                elif command == 'QUIT':
+                    self.reply('221 Bye')
+                    return
+                else:  # MAIL, RCPT, RSET, NOOP
+                    self.reply('250 OK')
+        except OSError:
+            pass
+        finally:
+            with server.lock:
+                server.sockets.discard(self.connection)
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Minimal in-process SMTP server that records what it receives.
+
+    Recipients listed in ``refuse`` are rejected with a 550, and while
+    ``unavailable`` is set new sessions are turned away with a 421.
+
+    Usage::
+
+        with LocalSMTPServer() as smtp:
+            app = create_app({'MAIL_SERVER': smtp.host, 'MAIL_PORT': smtp.port, ...})
+            ...
+            assert smtp.connections == 1 and len(smtp.messages) == 10
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _SMTPHandler)
+        self.host, self.port = self.server_address
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.sockets = set()
+        self.refuse = set()
+        self.unavailable = False
+
+    def mail_config(self):
+        """Flask config pointing Flask-Mail at this server without TLS or auth"""
+        return {
+            'MAIL_SERVER': self.host,
+            'MAIL_PORT': self.port,
+            'MAIL_USE_TLS': False,
+            'MAIL_USE_SSL': False,
+            'MAIL_USERNAME': None,
+            'MAIL_PASSWORD': None,
+            'MAIL_DEFAULT_SENDER': 'noreply@cafefausse.test',
+            'MAIL_SUPPRESS_SEND': False,
+            'MAIL_DEBUG': False,
+        }
+
+    def drop_connections(self):
+        """Close every open client session, as a server timeout would"""
+        with self.lock:
+            sockets = list(self.sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(2)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+@contextmanager
+def assert_max_queries(app, limit):
+    """Fail if the block runs more than ``limit`` SQL statements on the app's engine.
+
+    Usage::
+
+        with assert_max_queries(app, 2):
+            client.get('/api/reservations/lookup?...')
+
+    Yields the list of statements so far, for extra assertions.
+    """
+    from app import db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'after_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'after_cursor_execute', record)
+    assert len(statements) <= limit, (
+        f'{len(statements)} queries, expected at most {limit}:\n' + '\n'.join(statements)
+    )
@@ -0,0 +1,26 @@
+import csv
+import io
+
+
+def iter_csv(header, rows, flush_every=500):
+    """Yield a CSV document in chunks, escaping fields with the csv module.
+
+    The header goes out on its own so the first byte is sent immediately;
+    after that rows are buffered ``flush_every`` at a time, keeping memory
+    flat regardless of how many rows the iterable produces.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+
+    buffer.seek(0)
+    buffer.truncate()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % flush_every == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
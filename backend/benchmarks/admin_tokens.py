@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of validating a signed admin token
+
+Compares verify_admin_token() (HMAC check, expiry and revocation lookup)
+with the plain dict lookup it replaced, and times a full authenticated
+request through require_admin for context.
+
+Run from the backend directory:
+    python -m benchmarks.admin_tokens --iterations 100000
+"""
+
+import argparse
+import secrets
+import time
+
+from app import create_app, db
+from app.auth import issue_admin_token, verify_admin_token
+
+
+def per_call_us(func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'EMAIL_QUEUE_BACKEND': 'sync',
+        'LOG_LEVELS': 'app.access=WARNING',
+    })
+    with app.app_context():
+        db.create_all()
+        token = issue_admin_token(1)
+        old_token = secrets.token_urlsafe(32)
+        old_store = {old_token: 1}
+
+        results = [
+            ('dict lookup (previous)', per_call_us(lambda: old_store.get(old_token), args.iterations)),
+            ('verify_admin_token', per_call_us(lambda: verify_admin_token(token), args.iterations)),
+            ('verify_admin_token (bad signature)', per_call_us(lambda: verify_admin_token(token + 'x'), args.iterations)),
+        ]
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    requests = max(args.iterations // 100, 100)
+    results += [
+        ('GET /api/newsletter/campaigns, no token', per_call_us(lambda: client.get('/api/newsletter/campaigns'), requests)),
+        ('GET /api/newsletter/campaigns, token', per_call_us(lambda: client.get('/api/newsletter/campaigns', headers=headers), requests)),
+    ]
+
+    for name, us in results:
+        print(f"{name:<40}{us:>10.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: newsletter campaign throughput against a local SMTP stand-in
+
+Run from the backend directory:
+    python -m benchmarks.campaign_throughput --subscribers 5000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app import create_app, db
+from app.campaigns import campaign_progress, run_campaign
+from app.models import Newsletter, NewsletterCampaign
+from app.testing import LocalSMTPServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=5000)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--rate', type=float, default=0, help='messages per second, 0 = unthrottled')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, LocalSMTPServer() as smtp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'EMAIL_QUEUE_BACKEND': 'sync',
+            'NEWSLETTER_CHUNK_SIZE': args.chunk_size,
+            'NEWSLETTER_RATE_LIMIT': args.rate,
+            **smtp.mail_config(),
+        })
+        with app.app_context():
+            db.create_all()
+            now = datetime.now()
+            db.session.execute(insert(Newsletter), [
+                {'email': f'subscriber{i}@example.com', 'signup_date': now} for i in range(args.subscribers)
+            ])
+            campaign = NewsletterCampaign(subject='Benchmark', body_text='Hello from Café Fausse', created_at=now)
+            db.session.add(campaign)
+            db.session.commit()
+
+            start = time.perf_counter()
+            run_campaign(campaign.id)
+            elapsed = time.perf_counter() - start
+            progress = campaign_progress(campaign.id)
+            db.engine.dispose()
+
+    print(f"Subscribers:      {args.subscribers}")
+    print(f"Sent / failed:    {progress['sent']} / {progress['failed']}")
+    print(f"SMTP sessions:    {smtp.connections}")
+    print(f"Elapsed:          {elapsed:.2f}s")
+    print(f"Messages/second:  {progress['sent'] / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
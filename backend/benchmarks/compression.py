@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CPU cost versus bytes saved for response compression
+
+Compresses representative payloads (the grouped menu, a page of
+reservations and a reservations CSV export) at several levels, both in one
+shot and chunk by chunk as streamed responses are.
+
+Run from the backend directory:
+    python -m benchmarks.compression --rows 10000
+"""
+
+import argparse
+import json
+import time
+
+from app import compression, create_app
+from app.utils import iter_csv
+
+
+def menu_payload(items):
+    categories = ['Starters', 'Main Courses', 'Desserts', 'Beverages']
+    menu = {}
+    for i in range(items):
+        menu.setdefault(categories[i % 4], []).append({
+            'id': i + 1,
+            'name': f'Dish {i + 1}',
+            'description': 'Seasonal ingredients, prepared to order by our kitchen team.',
+            'price': 10 + i % 25
+        })
+    return json.dumps(menu).encode()
+
+
+def reservation_rows(rows):
+    for i in range(rows):
+        yield (
+            i + 1, 100 + i % 5000, f'Guest {i % 5000}', f'guest{i % 5000}@example.com', '555-0100',
+            f'2031-06-{1 + i % 28:02d}T{17 + i % 6}:{"00" if i % 2 else "30"}:00', 1 + i % 30, 1 + i % 8
+        )
+
+
+def reservations_payload(rows):
+    keys = ['id', 'customer_id', 'customer_name', 'email', 'phone', 'time_slot', 'table_number', 'number_of_guests']
+    return json.dumps({'reservations': [dict(zip(keys, row)) for row in reservation_rows(rows)]}).encode()
+
+
+def csv_chunks(rows):
+    header = ['id', 'customer_id', 'name', 'email', 'phone', 'time_slot', 'table_number', 'number_of_guests']
+    return [chunk.encode() for chunk in iter_csv(header, reservation_rows(rows))]
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='reservations in the CSV export')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'EMAIL_QUEUE_BACKEND': 'sync'})
+    chunks = csv_chunks(args.rows)
+    payloads = [
+        ('menu (200 items)', [menu_payload(200)]),
+        ('reservations page (500)', [reservations_payload(500)]),
+        (f'csv export ({args.rows} rows)', chunks),
+    ]
+    settings = [('gzip', 'COMPRESS_LEVEL', level) for level in (1, 6, 9)]
+    if compression.brotli:
+        settings += [('br', 'COMPRESS_BROTLI_LEVEL', level) for level in (1, 4, 11)]
+
+    print(f"{'payload':<28}{'encoding':<10}{'mode':<9}{'raw KB':>9}{'out KB':>9}{'ratio':>8}{'ms':>9}{'MB/s':>9}")
+    for name, parts in payloads:
+        raw = b''.join(parts)
+        for encoding, key, level in settings:
+            app.config[key] = level
+            with app.test_request_context():
+                modes = [('whole', lambda: compression.compress(raw, encoding))]
+                if len(parts) > 1:
+                    modes.append(('stream', lambda: b''.join(compression.compress_stream(iter(parts), encoding))))
+                for mode, func in modes:
+                    seconds, out = timed(func, args.repeat)
+                    print(
+                        f"{name:<28}{f'{encoding}-{level}':<10}{mode:<9}{len(raw) / 1024:>9.1f}"
+                        f"{len(out) / 1024:>9.1f}{len(raw) / len(out):>8.1f}{seconds * 1000:>9.2f}"
+                        f"{len(raw) / seconds / 1e6:>9.1f}"
+                    )
+    if not compression.brotli:
+        print("\nbrotli is not installed; only gzip was measured")
+
+
+if __name__ == "__main__":
+    main()
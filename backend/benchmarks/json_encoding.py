@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: encode time and allocations of the JSON providers
+
+Builds responses for a page of reservations (as get_all_reservations returns
+them) and the grouped menu (as get_menu_items does) with Flask's default
+provider, FastJSONProvider on the stdlib fallback and FastJSONProvider on
+orjson. The second reservations payload leaves time_slot as datetime
+objects (Flask's default provider writes those as HTTP dates).
+
+Run from the backend directory:
+    python -m benchmarks.json_encoding --rows 500
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest import mock
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app, json_provider
+from app.json_provider import FastJSONProvider
+
+
+def reservations_payload(rows, iso=True):
+    start = datetime(2031, 6, 1, 17)
+    reservations = []
+    for i in range(rows):
+        time_slot = start + timedelta(minutes=30 * (i // 30))
+        reservations.append({
+            'id': i + 1,
+            'customer_name': f'Guest {i % 5000}',
+            'email': f'guest{i % 5000}@example.com',
+            'phone': '555-0100',
+            'time_slot': time_slot.isoformat() if iso else time_slot,
+            'table_number': 1 + i % 30,
+            'number_of_guests': 1 + i % 8
+        })
+    return {'reservations': reservations, 'next_cursor': 'MjAzMS0wNi0xNFQxOTowMDowMHw1MDA='}
+
+
+def menu_payload(items):
+    categories = ['Starters', 'Main Courses', 'Desserts', 'Beverages']
+    menu = {}
+    for i in range(items):
+        menu.setdefault(categories[i % 4], []).append({
+            'id': i + 1,
+            'name': f'Dish {i + 1}',
+            'description': 'Seasonal ingredients, prepared to order by our kitchen team.',
+            'price': 10.5 + i % 25
+        })
+    return menu
+
+
+def measure(app, provider, payload, repeat, loops):
+    """Best per-call time in µs and peak traced allocation in KB for one response"""
+    with app.app_context():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(loops):
+                provider.response(payload)
+            best = min(best, (time.perf_counter() - started) / loops)
+        tracemalloc.start()
+        body = provider.response(payload).get_data()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best * 1e6, peak / 1024, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500, help='reservations in the page')
+    parser.add_argument('--menu-items', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--loops', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'EMAIL_QUEUE_BACKEND': 'sync'})
+    payloads = [
+        (f'reservations page ({args.rows})', reservations_payload(args.rows)),
+        (f'reservations, datetimes ({args.rows})', reservations_payload(args.rows, iso=False)),
+        (f'menu ({args.menu_items} items)', menu_payload(args.menu_items)),
+    ]
+    providers = [('flask default', DefaultJSONProvider(app), None), ('fast, stdlib', FastJSONProvider(app), None)]
+    if json_provider.orjson is not None:
+        providers.append(('fast, orjson', FastJSONProvider(app), json_provider.orjson))
+
+    print(f"{'payload':<36}{'provider':<16}{'µs':>10}{'peak KB':>10}{'bytes':>10}")
+    for name, payload in payloads:
+        for label, provider, orjson in providers:
+            with mock.patch.object(json_provider, 'orjson', orjson):
+                micros, peak, size = measure(app, provider, payload, args.repeat, args.loops)
+            print(f"{name:<36}{label:<16}{micros:>10.1f}{peak:>10.1f}{size:>10}")
+    if json_provider.orjson is None:
+        print("\norjson is not installed; only the stdlib encoders were measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Load test: latency percentiles and throughput for the API hot paths
+
+Seeds a database with realistic volumes, serves create_app() from a
+threaded WSGI server in this process (mail goes to a local SMTP stand-in)
+and drives concurrent requests at reservation create, availability, menu
+read, the admin reservation list and the CSV export. Results are written as
+JSON so runs on different commits can be compared.
+
+Run from the backend directory:
+    python -m benchmarks.load_test --output load-test.json
+    python -m benchmarks.load_test --database-url postgresql://localhost/cafe_bench --reset
+
+A --database-url is seeded in place; point it at a throwaway database.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+from app import create_app, db, email_queue
+from app.models import Admin, Customer, MenuItem, Newsletter, Reservation
+from app.occupancy import TABLE_COUNT, service_slots
+from app.testing import LocalSMTPServer
+
+BATCH_SIZE = 10000
+ADMIN = {'username': 'bench-admin', 'password': 'bench-password'}
+
+
+def batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def past_slots(days_back):
+    """Every bookable (time_slot, table) from ``days_back`` days ago up to yesterday"""
+    today = date.today()
+    for offset in range(days_back, 0, -1):
+        for slot in service_slots(today - timedelta(days=offset)):
+            for table in range(1, TABLE_COUNT + 1):
+                yield slot, table
+
+
+def seed(args):
+    """Bulk insert customers, reservations, newsletter subscribers and a menu"""
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    for batch in batched({
+        'name': f'Guest {i}', 'email': f'guest{i}@example.com',
+        'phone': f'555-{i % 10000:04d}', 'newsletter_signup': i % 4 == 0,
+    } for i in range(1, args.customers + 1)):
+        db.session.execute(insert(Customer), batch)
+
+    # Customers went into empty tables, so their ids run 1..N.
+    # 12 slots a day x 30 tables: 100k reservations fill roughly the last 280 days
+    days_back = -(-args.reservations // (12 * TABLE_COUNT)) + 1
+    slots = ((slot, table) for slot, table in past_slots(days_back))
+    rows = ({
+        'customer_id': rng.randint(1, args.customers), 'time_slot': slot,
+        'table_number': table, 'number_of_guests': rng.randint(1, 8),
+    } for (slot, table), _ in zip(slots, range(args.reservations)))
+    for batch in batched(rows):
+        db.session.execute(insert(Reservation), batch)
+
+    for batch in batched({
+        'email': f'subscriber{i}@example.com', 'signup_date': now - timedelta(minutes=i)
+    } for i in range(args.newsletter)):
+        db.session.execute(insert(Newsletter), batch)
+
+    categories = ['Starters', 'Main Courses', 'Desserts', 'Beverages']
+    db.session.execute(insert(MenuItem), [{
+        'name': f'Dish {i}', 'description': 'Seasonal ingredients, prepared to order by our kitchen team.',
+        'price': 8 + i % 30, 'category': categories[i % 4],
+    } for i in range(48)])
+    db.session.add(Admin(username=ADMIN['username'], password=generate_password_hash(ADMIN['password'])))
+    db.session.commit()
+    return days_back
+
+
+def request(base_url, method, path, body=None, headers=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method, headers={
+        'Content-Type': 'application/json', **(headers or {})
+    })
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(name, make_request, total, concurrency, ok_statuses):
+    """Issue ``total`` requests from ``concurrency`` threads; summary of latencies in ms"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        status = make_request(i)
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if status not in ok_statuses:
+                errors.append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        'requests': total,
+        'errors': len(errors),
+        'error_statuses': sorted(set(errors)),
+        'throughput_rps': round(total / wall, 1),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2),
+    }
+    print(f"{name:<20} {result['throughput_rps']:>8.1f} req/s  p50 {result['p50_ms']:>8.2f}  "
+          f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}")
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate tables in --database-url first')
+    parser.add_argument('--reservations', type=int, default=100000)
+    parser.add_argument('--customers', type=int, default=50000)
+    parser.add_argument('--newsletter', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    parser.add_argument('--export-requests', type=int, default=10, help='requests for the full CSV export')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='load-test.json')
+    args = parser.parse_args()
+
+    os.environ.setdefault('ADMIN_EMAIL', 'admin@cafefausse.test')
+    with tempfile.TemporaryDirectory() as tmp, LocalSMTPServer() as smtp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': database_url,
+            'RATELIMIT_ENABLED': False,
+            'LOG_LEVEL': 'WARNING',
+            'LOG_LEVELS': 'werkzeug=WARNING',
+            **smtp.mail_config(),
+        })
+
+        with app.app_context():
+            if args.reset:
+                db.drop_all()
+            db.create_all()
+            if db.session.execute(select(Reservation.id).limit(1)).first():
+                parser.error('the database already has reservations; pass --reset to drop its tables')
+            start = time.perf_counter()
+            days_back = seed(args)
+            seed_seconds = time.perf_counter() - start
+            db.session.remove()
+        print(f"Seeded {args.customers} customers, {args.reservations} reservations and "
+              f"{args.newsletter} subscribers in {seed_seconds:.1f}s")
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            login = urllib.request.Request(base_url + '/api/admin/login', data=json.dumps(ADMIN).encode(),
+                                           method='POST', headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(login) as response:
+                token = json.load(response)['token']
+            admin = {'Authorization': f'Bearer {token}'}
+
+            rng = random.Random(args.seed)
+            today = date.today()
+            # Bookings go to a quiet stretch of future days so slots don't fill up
+            future_slots = [slot for offset in range(30, 90) for slot in service_slots(today + timedelta(days=offset))]
+            seeded_days = [today - timedelta(days=offset) for offset in range(1, days_back + 1)]
+
+            scenarios = {
+                'reservation_create': (lambda i: request(base_url, 'POST', '/api/reservations/', {
+                    'time_slot': rng.choice(future_slots).isoformat(),
+                    'number_of_guests': rng.randint(1, 8),
+                    'customer_name': f'Load Guest {i}',
+                    'email': f'load{i}@example.com',
+                }), args.requests, {201, 409}),
+                'availability': (lambda i: request(
+                    base_url, 'GET', f'/api/reservations/availability?date={rng.choice(seeded_days).isoformat()}'
+                ), args.requests, {200}),
+                'menu_read': (lambda i: request(base_url, 'GET', '/api/menu/items'), args.requests, {200}),
+                'admin_list': (lambda i: request(
+                    base_url, 'GET', f'/api/reservations/all?limit=100&date_from={rng.choice(seeded_days).isoformat()}',
+                    headers=admin
+                ), args.requests, {200}),
+                'export_csv': (lambda i: request(base_url, 'GET', '/api/reservations/export', headers=admin),
+                               args.export_requests, {200}),
+            }
+            results = {
+                name: run_scenario(name, make_request, total, args.concurrency, ok)
+                for name, (make_request, total, ok) in scenarios.items()
+            }
+        finally:
+            server.shutdown()
+            email_queue.shutdown()
+            with app.app_context():
+                db.engine.dispose()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'database': database_url.split(':', 1)[0],
+        'seed': {'customers': args.customers, 'reservations': args.reservations, 'newsletter': args.newsletter},
+        'seed_seconds': round(seed_seconds, 1),
+        'concurrency': args.concurrency,
+        'scenarios': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
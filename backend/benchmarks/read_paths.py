@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ORM instances versus column-projected rows on the list endpoints
+
+Seeds --rows rows into each table behind the gallery, awards, reviews,
+newsletter list and menu endpoints, then builds each payload the old way
+(``Model.query.all()`` plus a dict per instance) and the current way
+(selecting only the needed columns). Reports the best time and the peak
+traced allocation of each.
+
+Run from the backend directory:
+    python -m benchmarks.read_paths --rows 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import create_app, db, landing
+from app.models import Award, GalleryImage, MenuItem, Newsletter, Review
+from app.routes.menu import load_menu
+from app.schemas import select_dicts
+
+
+def orm_menu():
+    menu = {}
+    for item in MenuItem.query.all():
+        menu.setdefault(item.category, []).append({
+            'id': item.id, 'name': item.name, 'description': item.description, 'price': item.price
+        })
+    return menu
+
+
+def orm_newsletter():
+    return [
+        {'id': n.id, 'email': n.email, 'signup_date': n.signup_date.isoformat() if n.signup_date else None}
+        for n in Newsletter.query.all()
+    ]
+
+
+PATHS = [
+    ('gallery images',
+     lambda: [{'id': i.id, 'url': i.url, 'caption': i.caption} for i in GalleryImage.query.all()],
+     landing.gallery_images),
+    ('awards',
+     lambda: [{'id': a.id, 'title': a.title, 'year': a.year} for a in Award.query.all()],
+     landing.awards),
+    ('reviews',
+     lambda: [{'id': r.id, 'review': r.review, 'source': r.source} for r in Review.query.all()],
+     landing.reviews),
+    ('newsletter signups', orm_newsletter,
+     lambda: select_dicts(Newsletter.id, Newsletter.email, Newsletter.signup_date)),
+    ('menu items', orm_menu, load_menu),
+]
+
+
+def seed(rows):
+    now = datetime.now()
+    categories = ['Starters', 'Main Courses', 'Desserts', 'Beverages']
+    db.session.execute(insert(GalleryImage), [
+        {'url': f'https://res.cloudinary.com/cafe/image/upload/v1/gallery/{i}.jpg', 'caption': f'Evening service {i}'}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(Award), [{'title': f'Award {i}', 'year': str(2000 + i % 25)} for i in range(rows)])
+    db.session.execute(insert(Review), [
+        {'review': 'An unforgettable evening of seasonal dishes and warm service. ' * 2, 'source': f'Guide {i}'}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(Newsletter), [
+        {'email': f'subscriber{i}@example.com', 'signup_date': now - timedelta(minutes=i)} for i in range(rows)
+    ])
+    db.session.execute(insert(MenuItem), [{
+        'name': f'Dish {i}', 'description': 'Seasonal ingredients, prepared to order by our kitchen team.',
+        'price': 8 + i % 30, 'category': categories[i % 4],
+    } for i in range(rows)])
+    db.session.commit()
+
+
+def measure(build, repeat):
+    """Best time in ms and peak traced allocation in KB, each run on a fresh session"""
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        build()
+        best = min(best, time.perf_counter() - started)
+    db.session.remove()
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    return best * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'EMAIL_QUEUE_BACKEND': 'sync',
+            'SLOW_QUERY_MS': 0,
+        })
+        with app.app_context():
+            db.create_all()
+            seed(args.rows)
+
+            print(f"{'endpoint':<22}{'orm ms':>10}{'rows ms':>10}{'speedup':>9}{'orm KB':>11}{'rows KB':>11}")
+            for name, orm_build, rows_build in PATHS:
+                orm_ms, orm_kb = measure(orm_build, args.repeat)
+                rows_ms, rows_kb = measure(rows_build, args.repeat)
+                print(f"{name:<22}{orm_ms:>10.1f}{rows_ms:>10.1f}{orm_ms / rows_ms:>8.1f}x"
+                      f"{orm_kb:>11.0f}{rows_kb:>11.0f}")
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Shared pytest fixtures for the backend tests
+
+``app`` is an isolated app on an in-memory SQLite database with the tables
+created and an ``admin``/``secret`` account. Mail is suppressed, email tasks
+run inline and rate limits are off. A test that needs other settings
+overrides only those, either with ``@pytest.mark.app_config(KEY=value)`` or by
+calling the ``make_app`` factory (e.g. for a second worker on the same
+database file).
+"""
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db, occupancy
+from app.models import Admin
+
+ADMIN_LOGIN = {'username': 'admin', 'password': 'secret'}
+
+TEST_CONFIG = {
+    'TESTING': True,
+    'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+    'MAIL_SUPPRESS_SEND': True,
+    'MAIL_DEFAULT_SENDER': 'noreply@cafefausse.test',
+    'EMAIL_QUEUE_BACKEND': 'sync',
+    'RATELIMIT_ENABLED': False,
+}
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'app_config(**config): settings applied over TEST_CONFIG by the app fixture')
+
+
+@pytest.fixture
+def make_app():
+    """Build an app from TEST_CONFIG plus overrides, with tables and the admin account"""
+    def make(**config):
+        app = create_app({**TEST_CONFIG, **config})
+        # The occupancy caches are per process, not per app; start each database empty
+        occupancy.slot_cache.clear()
+        occupancy.day_cache.clear()
+        with app.app_context():
+            db.create_all()
+            if not Admin.query.filter_by(username=ADMIN_LOGIN['username']).first():
+                db.session.add(Admin(username=ADMIN_LOGIN['username'],
+                                     password=generate_password_hash(ADMIN_LOGIN['password'])))
+                db.session.commit()
+        return app
+    return make
+
+
+@pytest.fixture
+def app(request, make_app):
+    config = {}
+    # Module-level marks first, so a test's own mark wins
+    for marker in reversed(list(request.node.iter_markers('app_config'))):
+        config.update(marker.kwargs)
+    return make_app(**config)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _login(client):
+    return client.post('/api/admin/login', json=ADMIN_LOGIN).get_json()['token']
+
+
+@pytest.fixture
+def login():
+    """Log the admin in on a given client and return the bearer token"""
+    return _login
+
+
+@pytest.fixture
+def admin_token(app):
+    # A separate client, so the session cookie set by login doesn't leak into ``client``
+    return _login(app.test_client())
+
+
+@pytest.fixture
+def admin_headers(admin_token):
+    return {'Authorization': f'Bearer {admin_token}'}
+
+
+def _book(client, i=0, time_slot='2031-06-14T19:00:00', **fields):
+    return client.post('/api/reservations/', json={
+        'time_slot': time_slot,
+        'number_of_guests': 2,
+        'customer_name': f'Guest {i}',
+        'email': f'guest{i}@example.com',
+        **fields,
+    })
+
+
+@pytest.fixture
+def book():
+    """Post a reservation for guest ``i``; keyword arguments override the payload"""
+    return _book
@@ -0,0 +1,25 @@
+"""
+Gunicorn settings picked up automatically when started from this directory
+
+With PROMETHEUS_MULTIPROC_DIR set, workers write metrics to that directory
+so /metrics reports totals across all of them.
+"""
+
+import glob
+import os
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    # Samples left over from a previous run would be added to the new totals
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,36 @@
+"""reservation query indexes
+
+Revision ID: 2b69265a7e79
+Revises: e3055b8b2b3a
+Create Date: 2026-10-17 15:43:15.742244
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2b69265a7e79'
+down_revision = 'e3055b8b2b3a'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_reservation_customer_id', ['customer_id']),
+    ('ix_reservation_time_slot_id', ['time_slot', 'id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, and avoids
+    # locking the reservation table against writes while it builds on Postgres
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'reservation', columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='reservation', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test signed admin tokens: shared across app instances, expiring and revocable
+"""
+
+import time
+
+import pytest
+
+
+def get_signups(client, token):
+    return client.get('/api/newsletter/all', headers={'Authorization': f'Bearer {token}'})
+
+
+@pytest.fixture
+def db_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'tokens.db'}"
+
+
+def test_token_from_one_worker_is_accepted_by_another(make_app, login, db_uri):
+    token = login(make_app(SQLALCHEMY_DATABASE_URI=db_uri, SECRET_KEY='test-secret').test_client())
+    other_worker = make_app(SQLALCHEMY_DATABASE_URI=db_uri, SECRET_KEY='test-secret').test_client()
+
+    assert get_signups(other_worker, token).status_code == 200
+    assert get_signups(other_worker, token[:-2] + 'xx').status_code == 401
+
+
+@pytest.mark.app_config(ADMIN_TOKEN_MAX_AGE=1)
+def test_tokens_expire(client, admin_token):
+    assert get_signups(client, admin_token).status_code == 200
+    time.sleep(2.1)
+    assert get_signups(client, admin_token).status_code == 401
+
+
+def test_logout_revokes_token(client, login):
+    token = login(client)
+    client.post('/api/admin/logout', headers={'Authorization': f'Bearer {token}'})
+
+    assert get_signups(client, token).status_code == 401
+    assert get_signups(client, login(client)).status_code == 200
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test the day availability endpoint
+"""
+
+import pytest
+
+DAY = '2031-06-14'  # a Saturday: 5PM-11PM in 30 minute slots
+
+
+def availability(client, day=DAY):
+    return client.get(f'/api/reservations/availability?date={day}')
+
+
+def test_slots_for_an_empty_day(client):
+    response = availability(client)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert list(body) == ['date', 'slots']
+    assert body['date'] == DAY
+    slots = body['slots']
+    assert [s['time_slot'] for s in slots][:2] == ['2031-06-14T17:00:00', '2031-06-14T17:30:00']
+    assert len(slots) == 12
+    assert slots[-1]['time_slot'] == '2031-06-14T22:30:00'
+    assert all(s == {'time_slot': s['time_slot'], 'tables_remaining': 30, 'available': True} for s in slots)
+
+
+def test_counts_taken_and_free_tables(client, book):
+    for i in range(3):
+        assert book(client, i, time_slot=f'{DAY}T19:00:00').status_code == 201
+    for i in range(3, 33):
+        book(client, i, time_slot=f'{DAY}T20:00:00')
+    assert book(client, 40, time_slot=f'{DAY}T23:30:00').status_code == 201
+
+    slots = {s['time_slot']: s for s in availability(client).get_json()['slots']}
+    assert slots[f'{DAY}T19:00:00']['tables_remaining'] == 27
+    assert slots[f'{DAY}T20:00:00'] == {'time_slot': f'{DAY}T20:00:00', 'tables_remaining': 0, 'available': False}
+    assert slots[f'{DAY}T17:00:00']['tables_remaining'] == 30
+    # A booking outside opening hours still shows up, after the regular slots
+    assert list(slots)[-1] == f'{DAY}T23:30:00'
+    assert slots[f'{DAY}T23:30:00']['tables_remaining'] == 29
+
+    # Sunday closes at 9PM and the bookings above don't leak into it
+    sunday = availability(client, '2031-06-15').get_json()['slots']
+    assert len(sunday) == 8
+    assert {s['tables_remaining'] for s in sunday} == {30}
+
+
+def test_past_slots_are_unavailable(client):
+    slots = availability(client, '2020-01-04').get_json()['slots']
+    assert slots and not any(s['available'] for s in slots)
+
+
+@pytest.mark.parametrize('day', ['', '14-06-2031', '2031-02-30'])
+def test_bad_date(client, day):
+    response = availability(client, day)
+    assert response.status_code == 400
+    assert 'YYYY-MM-DD' in response.get_json()['error']
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
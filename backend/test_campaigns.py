@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Test newsletter campaign progress, resume after an SMTP outage, leases and takeover
+"""
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from email import message_from_bytes
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import campaigns, db, email_queue
+from app.models import CampaignDelivery, EmailJob, Newsletter, NewsletterCampaign
+from app.testing import LocalSMTPServer
+
+SUBSCRIBERS = 10
+
+
+@pytest.fixture
+def smtp():
+    with LocalSMTPServer() as server:
+        yield server
+
+
+def add_subscribers(app, count, template='reader{}@example.com'):
+    with app.app_context():
+        db.session.execute(insert(Newsletter), [{'email': template.format(i)} for i in range(count)])
+        db.session.commit()
+
+
+@pytest.fixture
+def app(request, make_app, smtp):
+    config = {'NEWSLETTER_CHUNK_SIZE': 3, 'NEWSLETTER_RATE_LIMIT': 0, **smtp.mail_config()}
+    for marker in reversed(list(request.node.iter_markers('app_config'))):
+        config.update(marker.kwargs)
+    app = make_app(**config)
+    add_subscribers(app, SUBSCRIBERS)
+    return app
+
+
+@pytest.fixture
+def on_send(monkeypatch):
+    """Call ``hook(n)`` before the n-th message (1-based) of any run"""
+    hooks = []
+    calls = [0]
+    wait = campaigns.SendThrottle.wait
+
+    def counted_wait(throttle):
+        calls[0] += 1
+        for hook in hooks:
+            hook(calls[0])
+        wait(throttle)
+
+    monkeypatch.setattr(campaigns.SendThrottle, 'wait', counted_wait)
+    return hooks.append
+
+
+def start(client, admin_headers):
+    response = client.post('/api/newsletter/campaigns', json={'subject': 'Spring menu', 'body_text': 'Hello'},
+                           headers=admin_headers)
+    assert response.status_code == 202
+    return response.get_json()['campaign']['id']
+
+
+def campaign(client, admin_headers, campaign_id):
+    return client.get(f'/api/newsletter/campaigns/{campaign_id}', headers=admin_headers).get_json()
+
+
+def current_campaign():
+    return db.session.scalar(select(NewsletterCampaign.id))
+
+
+def received(smtp):
+    return Counter(message_from_bytes(m)['To'] for m in smtp.messages)
+
+
+def deliveries(app, campaign_id):
+    with app.app_context():
+        return Counter(db.session.scalars(
+            select(CampaignDelivery.status).where(CampaignDelivery.campaign_id == campaign_id)
+        ))
+
+
+def test_progress_counts_sent_and_rejected(app, client, admin_headers, smtp):
+    smtp.refuse = {'reader4@example.com'}
+    campaign_id = start(client, admin_headers)
+
+    state = campaign(client, admin_headers, campaign_id)
+    assert state['status'] == 'completed'
+    assert (state['sent'], state['failed'], state['subscribers']) == (9, 1, SUBSCRIBERS)
+    assert state['finished_at']
+    assert len(received(smtp)) == 9
+    assert client.post(f'/api/newsletter/campaigns/{campaign_id}/resume', headers=admin_headers).status_code == 409
+
+
+def test_resume_after_smtp_outage(app, client, admin_headers, smtp, on_send):
+    def outage(n):
+        if n == 5:
+            smtp.unavailable = True
+            smtp.drop_connections()
+    on_send(outage)
+
+    campaign_id = start(client, admin_headers)
+    state = campaign(client, admin_headers, campaign_id)
+    # The first chunk and one message of the second went out; nothing was recorded as failed
+    assert (state['status'], state['sent'], state['failed']) == ('interrupted', 4, 0)
+    assert deliveries(app, campaign_id) == {'sent': 4}
+
+    smtp.unavailable = False
+    assert client.post(f'/api/newsletter/campaigns/{campaign_id}/resume', headers=admin_headers).status_code == 202
+    state = campaign(client, admin_headers, campaign_id)
+    assert (state['status'], state['sent'], state['failed']) == ('completed', SUBSCRIBERS, 0)
+    assert received(smtp) == {f'reader{i}@example.com': 1 for i in range(SUBSCRIBERS)}
+
+
+def test_resume_when_the_server_was_down_from_the_start(app, client, admin_headers, smtp):
+    smtp.unavailable = True
+    campaign_id = start(client, admin_headers)
+    assert campaign(client, admin_headers, campaign_id)['status'] == 'interrupted'
+    assert deliveries(app, campaign_id) == {}
+
+    smtp.unavailable = False
+    client.post(f'/api/newsletter/campaigns/{campaign_id}/resume', headers=admin_headers)
+    assert campaign(client, admin_headers, campaign_id)['sent'] == SUBSCRIBERS
+
+
+def test_second_run_waits_while_the_lease_is_held(app, client, admin_headers, smtp, on_send):
+    second_runs = []
+
+    def second_run(n):
+        # Another worker starts the campaign while the first is half way through its second chunk
+        if n == 5:
+            campaign_id = current_campaign()
+            second_runs.append(campaigns.run_campaign(campaign_id))
+            response = client.post(f'/api/newsletter/campaigns/{campaign_id}/resume', headers=admin_headers)
+            second_runs.append((response.status_code, response.get_json()['error']))
+    on_send(second_run)
+
+    campaign_id = start(client, admin_headers)
+    # The second run sent nothing and asks the email queue to try again later
+    assert second_runs == [False, (409, 'Campaign is already sending.')]
+    state = campaign(client, admin_headers, campaign_id)
+    assert (state['status'], state['sent'], state['failed']) == ('completed', SUBSCRIBERS, 0)
+    assert received(smtp) == {f'reader{i}@example.com': 1 for i in range(SUBSCRIBERS)}
+    with app.app_context():
+        assert db.session.get(NewsletterCampaign, campaign_id).lease_until is None
+
+
+@pytest.mark.app_config(NEWSLETTER_LEASE=0.3)
+def test_run_that_outlived_its_lease_stops_at_the_next_message(app, client, admin_headers, smtp, on_send):
+    def stall_then_take_over(n):
+        # The first run stalls past its lease after reader3, and another run takes over
+        if n == 5:
+            time.sleep(0.4)
+            assert campaigns.run_campaign(current_campaign()) is True
+    on_send(stall_then_take_over)
+
+    campaign_id = start(client, admin_headers)
+    state = campaign(client, admin_headers, campaign_id)
+    assert (state['status'], state['sent'], state['failed']) == ('completed', SUBSCRIBERS, 0)
+    # Only reader3, sent before the stall but not yet recorded, went out twice;
+    # the stalled run sent nothing after losing its lease
+    assert received(smtp) == {f'reader{i}@example.com': 2 if i == 3 else 1 for i in range(SUBSCRIBERS)}
+
+
+def test_database_queue_lease_outlasting_a_long_campaign(make_app, tmp_path):
+    """A campaign that runs past EMAIL_QUEUE_LEASE keeps its job, so no other worker mails it again"""
+    with LocalSMTPServer() as smtp:
+        app = make_app(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'campaign.db'}",
+            EMAIL_QUEUE_BACKEND='database', EMAIL_QUEUE_LEASE=1,
+            NEWSLETTER_CHUNK_SIZE=5, NEWSLETTER_RATE_LIMIT=5,
+            **smtp.mail_config()
+        )
+        backend = email_queue.backend
+        # Drive the backend by hand instead of from its polling threads
+        backend.shutdown()
+        backend.stopping.clear()
+        add_subscribers(app, 20, 'r{}@x.com')
+        try:
+            with app.app_context():
+                campaign_id = db.session.scalar(insert(NewsletterCampaign).values(
+                    subject='Spring menu', body_text='Hello', status='queued', created_at=datetime.now()
+                ).returning(NewsletterCampaign.id))
+                db.session.commit()
+                campaigns.start_campaign(campaign_id)
+
+            def first_worker():
+                with app.app_context():
+                    processed.append(backend.process_due_jobs())
+            processed = []
+            worker = threading.Thread(target=first_worker)
+            worker.start()
+            time.sleep(1.6)
+            # A second worker polls after the original lease would have run out
+            with app.app_context():
+                assert backend.process_due_jobs() == 0
+            worker.join(timeout=30)
+            assert processed == [1]
+
+            assert received(smtp) == {f'r{i}@x.com': 1 for i in range(20)}
+            with app.app_context():
+                assert db.session.get(NewsletterCampaign, campaign_id).status == 'completed'
+                assert db.session.execute(select(EmailJob.status, EmailJob.attempts)).one() == ('sent', 1)
+        finally:
+            email_queue.shutdown()
+            with app.app_context():
+                db.engine.dispose()
+
+
+def test_new_owner_continues_past_rows_recorded_by_the_old_run(app, client, admin_headers, smtp, on_send):
+    def stale_run_records(n):
+        # The run this one took over from records part of the current chunk first
+        if n == 2:
+            db.session.execute(insert(CampaignDelivery), [{
+                'campaign_id': current_campaign(), 'newsletter_id': 1, 'email': 'reader0@example.com',
+                'status': 'sent', 'sent_at': datetime.now(),
+            }])
+            db.session.commit()
+    on_send(stale_run_records)
+
+    campaign_id = start(client, admin_headers)
+    state = campaign(client, admin_headers, campaign_id)
+    assert (state['status'], state['sent'], state['failed']) == ('completed', SUBSCRIBERS, 0)
+    assert len(received(smtp)) == SUBSCRIBERS
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test gzip negotiation for regular, streamed and cached responses
+"""
+
+import gzip
+
+import pytest
+
+from app import db
+from app.models import MenuItem, Newsletter
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(COMPRESS_BROTLI=False)
+    with app.app_context():
+        db.session.add_all(Newsletter(email=f'guest{i}@example.com') for i in range(2000))
+        db.session.add_all(
+            MenuItem(name=f'Dish {i}', description='Seasonal special', price=12, category='Mains')
+            for i in range(50)
+        )
+        db.session.commit()
+    return app
+
+
+def test_json_is_gzipped_when_accepted(client, admin_headers):
+    plain = client.get('/api/newsletter/all', headers=admin_headers)
+    compressed = client.get('/api/newsletter/all', headers={**admin_headers, **GZIP})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert len(compressed.data) < len(plain.data) / 4
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_small_responses_are_left_alone(client):
+    response = client.get('/api/health', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_streamed_csv_is_gzipped(client, admin_headers):
+    response = client.get('/api/newsletter/export', headers={**admin_headers, **GZIP})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert lines[0] == 'id,email,signup_date'
+    assert len(lines) == 2001
+
+
+def test_cached_menu_has_compressed_variant(client):
+    plain = client.get('/api/menu/items')
+    compressed = client.get('/api/menu/items', headers=GZIP)
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+
+    revalidated = client.get('/api/menu/items', headers={'If-None-Match': compressed.headers['ETag'], **GZIP})
+    assert revalidated.status_code == 304
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
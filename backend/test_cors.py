@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test CORS preflights are answered before dispatch and origins are checked
+"""
+
+import pytest
+
+ALLOWED = 'https://cafe-fausse.onrender.com'
+
+pytestmark = pytest.mark.app_config(CORS_ORIGINS=[ALLOWED], CORS_MAX_AGE=600)
+
+
+def preflight(client, path, origin):
+    return client.options(path, headers={
+        'Origin': origin,
+        'Access-Control-Request-Method': 'DELETE',
+        'Access-Control-Request-Headers': 'Authorization',
+    })
+
+
+def test_preflight_short_circuits_for_allowed_origin(client):
+    response = preflight(client, '/api/reservations/42', ALLOWED)
+
+    assert response.status_code == 204
+    assert response.headers['Access-Control-Allow-Origin'] == ALLOWED
+    assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+    assert 'DELETE' in response.headers['Access-Control-Allow-Methods']
+    assert 'Authorization' in response.headers['Access-Control-Allow-Headers']
+    assert response.headers['Access-Control-Max-Age'] == '600'
+
+
+def test_unknown_origin_gets_no_cors_headers(client):
+    response = preflight(client, '/api/reservations/42', 'https://evil.example.com')
+    assert response.status_code == 204
+    assert 'Access-Control-Allow-Origin' not in response.headers
+
+    response = client.get('/api/health', headers={'Origin': 'https://evil.example.com'})
+    assert 'Access-Control-Allow-Origin' not in response.headers
+    assert 'Origin' in response.headers['Vary']
+
+
+def test_simple_request_from_allowed_origin(client):
+    response = client.get('/api/health', headers={'Origin': ALLOWED})
+    assert response.headers['Access-Control-Allow-Origin'] == ALLOWED
+    assert 'Access-Control-Max-Age' not in response.headers
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
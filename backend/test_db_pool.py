@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test pool configuration and the /api/admin/db-pool metrics
+"""
+
+import threading
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import db
+from app.db_pool import InstrumentedQueuePool, engine_options
+
+
+@pytest.mark.app_config(DB_POOL_SIZE=8, DB_POOL_RECYCLE=300)
+def test_engine_options_from_config(app):
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS'] == {}  # SQLite keeps its own pool
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://cafe@db.example.com/cafe_fausse'
+    options = engine_options(app)
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['pool_size'] == 8
+    assert options['pool_recycle'] == 300
+    assert options['pool_pre_ping'] is True
+
+
+def test_pool_metrics_report_checkouts_and_timeouts(make_app, login, tmp_path):
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'pool.db'}",
+        SQLALCHEMY_ENGINE_OPTIONS={
+            'poolclass': InstrumentedQueuePool, 'pool_size': 2, 'max_overflow': 0, 'pool_timeout': 1,
+        },
+    )
+    with app.app_context():
+        engine = db.engine
+        held = [engine.connect(), engine.connect()]
+        timed_out = threading.Event()
+
+        def wait_for_connection():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            timed_out.set()
+
+        thread = threading.Thread(target=wait_for_connection)
+        thread.start()
+        thread.join()
+        assert timed_out.is_set()
+        for conn in held:
+            conn.close()
+
+    token = login(app.test_client())
+    metrics = app.test_client().get('/api/admin/db-pool', headers={'Authorization': f'Bearer {token}'}).get_json()
+
+    assert metrics['pool'] == 'InstrumentedQueuePool'
+    assert metrics['size'] == 2
+    assert metrics['timeouts'] == 1
+    assert metrics['wait_ms_max'] >= 900
+    assert metrics['checkouts'] >= 3
+    assert metrics['checked_out'] == 0
+    assert metrics['idle'] == 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Test email retries, dead-lettering and the database backend's leases
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app import db, email_queue
+from app.models import EmailJob
+from app.testing import LocalSMTPServer
+
+RESERVATION = {
+    'id': 7,
+    'customer_name': 'Guest 7',
+    'email': 'guest7@example.com',
+    'phone': None,
+    'time_slot': '2031-06-14T19:00:00',
+    'table_number': 12,
+    'number_of_guests': 2,
+}
+
+
+@pytest.fixture
+def down_smtp():
+    """Mail settings for an SMTP server that refuses connections"""
+    with LocalSMTPServer() as smtp:
+        config = smtp.mail_config()
+    return config
+
+
+@pytest.fixture
+def queue_app(make_app, tmp_path):
+    apps = []
+
+    def make(**config):
+        app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'queue.db'}", **config)
+        apps.append(app)
+        return app
+    yield make
+    email_queue.shutdown()
+    for app in apps:
+        with app.app_context():
+            db.engine.dispose()
+
+
+@pytest.fixture
+def retry_delays(monkeypatch):
+    """Record each retry's backoff but fire the timer right away"""
+    delays = []
+
+    class ImmediateTimer(threading.Timer):
+        def __init__(self, interval, function):
+            delays.append(interval)
+            super().__init__(0, function)
+
+    monkeypatch.setattr(threading, 'Timer', ImmediateTimer)
+    return delays
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_thread_backend_retries_with_backoff_then_gives_up(queue_app, down_smtp, retry_delays, caplog, monkeypatch):
+    queue_app(EMAIL_QUEUE_BACKEND='thread', EMAIL_MAX_ATTEMPTS=4, EMAIL_RETRY_BACKOFF=1.5, **down_smtp)
+    attempts = []
+    run = email_queue.run
+    monkeypatch.setattr(email_queue, 'run', lambda *args: attempts.append(args) or run(*args))
+
+    email_queue.enqueue('reservation_cancellation', RESERVATION)
+    wait_for(lambda: 'Email task reservation_cancellation failed after 4 attempts' in caplog.text)
+    assert len(attempts) == 4
+    assert retry_delays == [1.5, 3.0, 6.0]
+    assert email_queue.backend.retries == {}
+
+
+def test_thread_backend_stops_retrying_once_delivered(queue_app, retry_delays, monkeypatch):
+    queue_app(EMAIL_QUEUE_BACKEND='thread', EMAIL_MAX_ATTEMPTS=4)
+    results = iter([False, False, True])
+    delivered = []
+    monkeypatch.setattr(email_queue, 'run', lambda *args: delivered.append(next(results)) or delivered[-1])
+
+    email_queue.enqueue('reservation_cancellation', RESERVATION)
+    wait_for(lambda: delivered == [False, False, True])
+    email_queue.shutdown()
+    assert retry_delays == [2, 4]
+    assert delivered == [False, False, True]
+
+
+def test_shutdown_cancels_the_backoff_and_makes_a_last_attempt(queue_app, monkeypatch):
+    queue_app(EMAIL_QUEUE_BACKEND='thread', EMAIL_MAX_ATTEMPTS=4, EMAIL_RETRY_BACKOFF=60)
+    backend = email_queue.backend
+    results = iter([False, True])
+    delivered = []
+    monkeypatch.setattr(email_queue, 'run', lambda *args: delivered.append(next(results)) or delivered[-1])
+
+    email_queue.enqueue('reservation_cancellation', RESERVATION)
+    wait_for(lambda: backend.retries)
+    (timer,) = backend.retries
+
+    started = time.monotonic()
+    email_queue.shutdown()
+    assert time.monotonic() - started < 5
+    assert not timer.is_alive()
+    assert delivered == [False, True]
+    assert backend.retries == {}
+
+
+def test_exit_does_not_wait_out_the_backoff():
+    # A job sleeping in a 60s backoff must not hold up interpreter exit
+    script = (
+        "from app import create_app, email_queue\n"
+        "app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'EMAIL_QUEUE_BACKEND': 'thread',\n"
+        "                  'EMAIL_MAX_ATTEMPTS': 3, 'EMAIL_RETRY_BACKOFF': 60})\n"
+        "calls = []\n"
+        "email_queue.task('flaky')(lambda payload: calls.append(payload) and False)\n"
+        "email_queue.enqueue('flaky', 1)\n"
+        "import time\n"
+        "while not calls:\n"
+        "    time.sleep(0.01)\n"
+    )
+    started = time.monotonic()
+    subprocess.run([sys.executable, '-c', script], cwd=Path(__file__).parent, check=True, timeout=30)
+    assert time.monotonic() - started < 20
+
+
+def db_backend_app(queue_app, **config):
+    app = queue_app(EMAIL_QUEUE_BACKEND='database', EMAIL_MAX_ATTEMPTS=3, EMAIL_RETRY_BACKOFF=60, **config)
+    # Drive the backend by hand instead of from its polling thread
+    email_queue.backend.shutdown()
+    email_queue.backend.stopping.clear()
+    return app, email_queue.backend
+
+
+def job_state(app):
+    with app.app_context():
+        job = db.session.execute(db.select(EmailJob)).scalar_one()
+        return job.status, job.attempts, job.next_attempt_at
+
+
+def make_due(app):
+    with app.app_context():
+        db.session.execute(db.update(EmailJob).values(next_attempt_at=datetime.now() - timedelta(seconds=1)))
+        db.session.commit()
+
+
+def test_db_backend_backs_off_then_dead_letters(queue_app, down_smtp):
+    app, backend = db_backend_app(queue_app, **down_smtp)
+    with app.app_context():
+        email_queue.enqueue('reservation_cancellation', RESERVATION)
+
+    for attempt, delay in [(1, 60), (2, 120)]:
+        started = datetime.now()
+        with app.app_context():
+            assert backend.process_due_jobs() == 1
+        status, attempts, next_attempt_at = job_state(app)
+        assert (status, attempts) == ('pending', attempt)
+        assert started + timedelta(seconds=delay) <= next_attempt_at <= datetime.now() + timedelta(seconds=delay)
+        with app.app_context():
+            assert backend.process_due_jobs() == 0
+        make_due(app)
+
+    with app.app_context():
+        assert backend.process_due_jobs() == 1
+    assert job_state(app)[:2] == ('failed', 3)
+    make_due(app)
+    with app.app_context():
+        assert backend.process_due_jobs() == 0
+
+
+def test_db_backend_delivers_once_the_server_is_back(queue_app):
+    with LocalSMTPServer() as smtp:
+        app, backend = db_backend_app(queue_app, **smtp.mail_config())
+        with app.app_context():
+            email_queue.enqueue('reservation_cancellation', RESERVATION)
+            assert backend.process_due_jobs() == 1
+        assert job_state(app)[:2] == ('sent', 1)
+        assert len(smtp.messages) == 1
+
+
+def test_db_backend_lease(queue_app, monkeypatch):
+    app, backend = db_backend_app(queue_app)
+    delivered = []
+    monkeypatch.setattr(email_queue, 'run', lambda app, name, payload: delivered.append(payload) or True)
+
+    # Two workers read the same due row; only one claim wins
+    with app.app_context():
+        email_queue.enqueue('reservation_cancellation', RESERVATION)
+        job = db.session.execute(db.select(EmailJob.__table__)).one()
+        assert backend.claim(job) is True
+        assert backend.claim(job) is False
+    status, attempts, lease_until = job_state(app)
+    assert (status, attempts) == ('sending', 1)
+    assert lease_until > datetime.now() + timedelta(seconds=250)
+
+    # While the lease holds, nobody else picks the job up
+    with app.app_context():
+        assert backend.process_due_jobs() == 0
+    assert delivered == []
+
+    # The claiming worker died; once the lease expires the job is reclaimed
+    make_due(app)
+    with app.app_context():
+        assert backend.process_due_jobs() == 1
+    assert delivered == [RESERVATION]
+    assert job_state(app)[:2] == ('sent', 2)
+
+
+def test_db_backend_renews_and_fences_the_lease(queue_app, monkeypatch):
+    app, backend = db_backend_app(queue_app, EMAIL_QUEUE_LEASE=3)
+    seen = []
+
+    def long_task(payload):
+        job = db.session.execute(db.select(EmailJob.__table__)).one()
+        # Not due for renewal yet: no write
+        assert email_queue.renew_lease() is True
+        assert job_state(app)[2] == job.next_attempt_at
+
+        monkeypatch.setattr(time, 'monotonic', lambda: real_monotonic() + 2)
+        assert email_queue.renew_lease() is True
+        seen.append(job_state(app)[2] - job.next_attempt_at)
+
+        # Another worker claims the job after its lease ran out
+        make_due(app)
+        assert backend.claim(db.session.execute(db.select(EmailJob.__table__)).one()) is True
+        assert email_queue.renew_lease() is False
+        assert email_queue.renew_lease() is False
+        return True
+
+    real_monotonic = time.monotonic
+    email_queue.task('long_task')(long_task)
+    with app.app_context():
+        email_queue.enqueue('long_task', 1)
+        assert backend.process_due_jobs() == 1
+    assert seen[0] > timedelta(0)
+    # The stale run's result doesn't overwrite the new claim
+    assert job_state(app)[:2] == ('sending', 2)
+    # Outside a job there is no lease to renew
+    assert email_queue.renew_lease() is True
+
+
+def test_db_backend_long_job_does_not_hold_up_the_others(queue_app):
+    release = threading.Event()
+    ran = []
+    email_queue.task('slow')(lambda payload: release.wait(10))
+    email_queue.task('fast')(lambda payload: ran.append(payload) or True)
+    app = queue_app(EMAIL_QUEUE_BACKEND='database', EMAIL_QUEUE_WORKERS=2, EMAIL_QUEUE_POLL_INTERVAL=0.05)
+    try:
+        with app.app_context():
+            email_queue.enqueue('slow', 1)
+            time.sleep(0.2)
+            email_queue.enqueue('fast', 2)
+        deadline = time.monotonic() + 5
+        while not ran and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ran == [2]
+    finally:
+        release.set()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
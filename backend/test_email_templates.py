@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test rendering of the precompiled email templates
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.email_templates import TEMPLATE_NAMES, format_slot_time
+from app.models import Customer, Reservation
+
+NAME = 'Ann & "Bo" <Lee>'
+
+PAYLOAD = {
+    'id': 42,
+    'customer_name': NAME,
+    'email': 'ann@example.com',
+    'phone': '555-0100',
+    'time_slot': '2031-06-14T19:00:00',
+    'table_number': 7,
+    'number_of_guests': 3,
+}
+
+
+@pytest.fixture
+def templates(app):
+    # Message() reads MAIL_DEFAULT_SENDER from the current app
+    with app.app_context():
+        yield app.extensions['email_templates']
+
+
+@pytest.mark.parametrize('name', TEMPLATE_NAMES)
+def test_every_template_renders_all_parts(templates, name):
+    subject, text, html = templates.render(name, reservation=PAYLOAD)
+    assert subject and '\n' not in subject
+    assert text.strip() and text.endswith('\n')
+    assert html.startswith('<html>') and html.endswith('</html>')
+
+    message = templates.message(name, ['guest@example.com'], reservation=PAYLOAD)
+    assert (message.subject, message.body, message.html) == (subject, text, html)
+
+
+@pytest.mark.parametrize('name', ['reservation_confirmation', 'reservation_update', 'admin_notification'])
+def test_html_part_escapes_names_and_text_part_does_not(templates, name):
+    subject, text, html = templates.render(name, reservation=PAYLOAD)
+    assert NAME in text
+    assert NAME not in html
+    assert 'Ann &amp; &#34;Bo&#34; &lt;Lee&gt;' in html
+
+
+def test_admin_subject_is_not_escaped(templates):
+    subject, _, _ = templates.render('admin_notification', reservation=PAYLOAD)
+    assert subject == f'New Reservation - {NAME}'
+
+
+@pytest.mark.parametrize('value, expected', [
+    (datetime(2031, 6, 14, 19, 0), 'June 14, 2031 at 07:00 PM'),
+    ('2031-06-14T19:00:00', 'June 14, 2031 at 07:00 PM'),
+    ('2031-06-14T19:00:00Z', 'June 14, 2031 at 07:00 PM'),
+    ('next Friday', 'next Friday'),
+    (None, 'TBD'),
+])
+def test_slot_time(value, expected):
+    assert format_slot_time(value) == expected
+
+
+@pytest.mark.parametrize('name', ['reservation_confirmation', 'reservation_cancellation',
+                                  'reservation_update', 'admin_notification'])
+def test_orm_reservation_and_payload_render_the_same(templates, name):
+    customer = Customer(name=NAME, email='ann@example.com', phone='555-0100')
+    reservation = Reservation(id=42, customer=customer, time_slot=datetime(2031, 6, 14, 19, 0),
+                              table_number=7, number_of_guests=3)
+    assert templates.render(name, reservation=reservation) == templates.render(name, reservation=PAYLOAD)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
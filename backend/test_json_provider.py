@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test the orjson-backed JSON provider and its stdlib fallback
+"""
+
+import decimal
+from datetime import datetime
+
+import pytest
+from flask import request
+from werkzeug.exceptions import BadRequest
+
+from app import json_provider
+
+PAYLOAD = {
+    'time_slot': datetime(2031, 6, 14, 19, 30),
+    'price': decimal.Decimal('12.50'),
+    'name': 'Crème brûlée',
+    7: 'non-string key',
+}
+EXPECTED = b'{"time_slot":"2031-06-14T19:30:00","price":"12.50","name":"Cr\xc3\xa8me br\xc3\xbbl\xc3\xa9e","7":"non-string key"}'
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request, monkeypatch, make_app):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip('orjson not installed')
+    return make_app()
+
+
+def test_compact_iso_output(app):
+    with app.app_context():
+        assert app.json.dumps_bytes(PAYLOAD) == EXPECTED
+        assert app.json.dumps(PAYLOAD) == EXPECTED.decode()
+        assert app.json.response(PAYLOAD).get_data() == EXPECTED + b'\n'
+        assert app.json.loads(EXPECTED) == {'time_slot': '2031-06-14T19:30:00', 'price': '12.50',
+                                            'name': 'Crème brûlée', '7': 'non-string key'}
+        with pytest.raises(TypeError):
+            app.json.dumps_bytes({'value': object()})
+
+        app.debug = True
+        assert app.json.response({'a': 1}).get_data() == b'{\n  "a": 1\n}\n'
+
+
+def test_request_bodies(app):
+    with app.test_request_context(method='POST', data=EXPECTED, content_type='application/json'):
+        assert request.get_json()['time_slot'] == '2031-06-14T19:30:00'
+    with app.test_request_context(method='POST', data='{not json', content_type='application/json'):
+        with pytest.raises(BadRequest):
+            request.get_json()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
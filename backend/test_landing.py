@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test that the landing payload is served from cache with an ETag and
+refreshed by gallery and about writes
+"""
+
+import pytest
+
+from app import db
+from app.models import AboutInfo, Award, GalleryImage, Review
+from app.testing import assert_max_queries
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        db.session.add_all([
+            GalleryImage(url='https://example.com/terrace.jpg', caption='The terrace'),
+            Award(title='Best Bistro', year='2023'),
+            Review(review='Wonderful pasta.', source='Local Times'),
+            AboutInfo(history='Founded in 2010.', mission='Fresh food, warm welcome.'),
+        ])
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as sess:
+        sess['admin_id'] = 1
+    return client
+
+
+def test_landing_is_cached_and_conditional(app, client):
+    first = client.get('/api/gallery/landing')
+    assert first.status_code == 200
+    landing = first.get_json()
+    assert landing['images'][0]['caption'] == 'The terrace'
+    assert landing['awards'][0]['title'] == 'Best Bistro'
+    assert landing['reviews'][0]['source'] == 'Local Times'
+    assert landing['about']['mission'] == 'Fresh food, warm welcome.'
+    assert len(landing['about']['founders']) == 2
+    etag = first.headers['ETag']
+
+    with assert_max_queries(app, 0):
+        assert client.get('/api/gallery/landing').data == first.data
+        not_modified = client.get('/api/gallery/landing', headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304
+
+
+def test_gallery_write_refreshes_landing(admin_client):
+    etag = admin_client.get('/api/gallery/landing').headers['ETag']
+
+    response = admin_client.post('/api/gallery/awards', json={'title': 'Chef of the Year', 'year': '2024'})
+    assert response.status_code == 201
+
+    refreshed = admin_client.get('/api/gallery/landing', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert [a['title'] for a in refreshed.get_json()['awards']] == ['Best Bistro', 'Chef of the Year']
+
+
+def test_about_write_refreshes_landing(admin_client):
+    etag = admin_client.get('/api/gallery/landing').headers['ETag']
+
+    response = admin_client.put('/api/about/info', json={'mission': 'Seasonal plates.'})
+    assert response.status_code == 200
+
+    refreshed = admin_client.get('/api/gallery/landing', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert refreshed.get_json()['about']['mission'] == 'Seasonal plates.'
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the queued JSON logging: record handling and the flush at exit
+"""
+
+import json
+import logging
+import queue
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.log import RequestQueueHandler
+
+
+def test_prepare_leaves_the_original_record_alone(app):
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = logging.getLogger('test').makeRecord('test', logging.ERROR, __file__, 1, 'failed %s', ('x',),
+                                                      sys.exc_info())
+    log_queue = queue.SimpleQueue()
+    with app.test_request_context('/api/menu/'):
+        RequestQueueHandler(log_queue).handle(record)
+
+    queued = log_queue.get_nowait()
+    assert queued is not record
+    assert queued.exc_info is None and 'ValueError: boom' in queued.exc_text
+    assert queued.method == 'GET' and queued.route == '/api/menu/'
+    # Handlers after this one still get the traceback and no request fields
+    assert record.exc_info[0] is ValueError
+    assert not hasattr(record, 'method')
+
+
+def make_record(msg, args):
+    return logging.getLogger('test').makeRecord('test', logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_prepare_defers_formatting_of_scalar_args(app):
+    record = make_record('%s guests at table %d', ('Ann', 7))
+    queued = RequestQueueHandler(queue.SimpleQueue()).prepare(record)
+    assert (queued.msg, queued.args) == ('%s guests at table %d', ('Ann', 7))
+    assert queued.getMessage() == 'Ann guests at table 7'
+
+
+def test_prepare_renders_mutable_args_on_the_calling_thread(app):
+    guests = ['Ann']
+    queued = RequestQueueHandler(queue.SimpleQueue()).prepare(make_record('guests: %s', (guests,)))
+    guests.append('Bo')
+    assert queued.args is None
+    assert queued.getMessage() == "guests: ['Ann']"
+
+
+def test_prepare_copies_mapping_args(app):
+    fields = {'name': 'Ann'}
+    queued = RequestQueueHandler(queue.SimpleQueue()).prepare(make_record('guest %(name)s', (fields,)))
+    fields['name'] = 'Bo'
+    assert queued.getMessage() == 'guest Ann'
+
+
+def test_logs_written_while_the_email_queue_drains_are_kept():
+    script = (
+        "import logging\n"
+        "from app import create_app, email_queue\n"
+        "app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'EMAIL_QUEUE_BACKEND': 'sync'})\n"
+        "class Draining:\n"
+        "    def shutdown(self, wait=True):\n"
+        "        logging.getLogger('app.email_queue').warning('drained at exit')\n"
+        "email_queue.backend = Draining()\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=Path(__file__).parent,
+                            capture_output=True, text=True, check=True, timeout=30)
+    messages = [json.loads(line)['message'] for line in result.stdout.splitlines()]
+    assert messages[-1] == 'drained at exit'
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
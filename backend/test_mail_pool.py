@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test that pooled SMTP sessions are reused and reopened after a disconnect
+"""
+
+import pytest
+from flask_mail import Message
+
+from app import smtp_pool
+from app.testing import LocalSMTPServer
+
+
+def message(i):
+    return Message(subject=f'Test {i}', recipients=[f'guest{i}@example.com'], body='Hello')
+
+
+def test_messages_share_one_session(make_app):
+    with LocalSMTPServer() as smtp:
+        app = make_app(**smtp.mail_config())
+        with app.app_context():
+            for i in range(5):
+                smtp_pool.send(message(i))
+            smtp_pool.send_batch([message(i) for i in range(5, 10)])
+            smtp_pool.close_all()
+
+        assert len(smtp.messages) == 10
+        assert smtp.connections == 1
+
+
+def test_reconnects_after_server_drops_session(make_app):
+    with LocalSMTPServer() as smtp:
+        app = make_app(**smtp.mail_config())
+        with app.app_context():
+            smtp_pool.send(message(1))
+            smtp.drop_connections()
+            smtp_pool.send(message(2))
+            smtp_pool.close_all()
+
+        assert len(smtp.messages) == 2
+        assert smtp.connections == 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test that the menu is served from cache with an ETag and refreshed on writes
+"""
+
+import pytest
+
+from app import db
+from app.models import MenuItem
+from app.testing import assert_max_queries
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        db.session.add(MenuItem(name='Bruschetta', description='Tomato and basil', price=8.5, category='Starters'))
+        db.session.commit()
+    return app
+
+
+def test_menu_is_cached_and_conditional(app, client):
+    first = client.get('/api/menu/items')
+    assert first.status_code == 200
+    assert first.get_json()['Starters'][0]['name'] == 'Bruschetta'
+    etag = first.headers['ETag']
+    assert not etag.startswith('W/')
+    assert 'no-cache' in first.headers['Cache-Control']
+
+    with assert_max_queries(app, 0):
+        assert client.get('/api/menu/items').data == first.data
+        not_modified = client.get('/api/menu/items', headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304
+
+
+def test_writes_invalidate_menu(client):
+    etag = client.get('/api/menu/items').headers['ETag']
+
+    with client.session_transaction() as sess:
+        sess['admin_id'] = 1
+    response = client.post('/api/menu/items', json={
+        'name': 'Tiramisu', 'description': 'Coffee and mascarpone', 'price': 7, 'category': 'Desserts'
+    })
+    assert response.status_code == 201
+
+    refreshed = client.get('/api/menu/items', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert refreshed.get_json()['Desserts'][0]['name'] == 'Tiramisu'
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus /metrics endpoint
+"""
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def scrape(client, **kwargs):
+    response = client.get('/metrics', **kwargs)
+    assert response.status_code == 200
+    samples = {}
+    for family in text_string_to_metric_families(response.get_data(as_text=True)):
+        for sample in family.samples:
+            samples[(sample.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return samples
+
+
+def value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def test_requests_and_queries_are_counted(client):
+    before = scrape(client)
+
+    for _ in range(3):
+        client.get('/api/menu/items')
+    client.get('/api/no-such-route')
+    after = scrape(client)
+
+    menu = dict(blueprint='menu', endpoint='menu.get_menu_items', method='GET')
+    assert value(after, 'http_requests_total', status='200', **menu) - value(before, 'http_requests_total', status='200', **menu) == 3
+    assert value(after, 'http_request_duration_seconds_count', **menu) - value(before, 'http_request_duration_seconds_count', **menu) == 3
+    unmatched = dict(blueprint='', endpoint='unmatched', method='GET', status='404')
+    assert value(after, 'http_requests_total', **unmatched) - value(before, 'http_requests_total', **unmatched) == 1
+    assert value(after, 'db_queries_total') > value(before, 'db_queries_total')
+
+
+@pytest.mark.app_config(MAIL_SERVER='127.0.0.1', MAIL_PORT=1, MAIL_USE_TLS=False, MAIL_SUPPRESS_SEND=False)
+def test_email_attempts_are_counted(client):
+    before = scrape(client)
+
+    client.post('/api/newsletter/', json={'email': 'guest@example.com'})
+    after = scrape(client)
+
+    failed = dict(task='newsletter_welcome', result='failed')
+    assert value(after, 'email_tasks_total', **failed) - value(before, 'email_tasks_total', **failed) == 1
+    assert value(after, 'email_messages_total', result='failed') - value(before, 'email_messages_total', result='failed') == 1
+
+
+@pytest.mark.app_config(METRICS_TOKEN='scrape-me')
+def test_metrics_token(client):
+    assert client.get('/metrics').status_code == 401
+    scrape(client, headers={'Authorization': 'Bearer scrape-me'})
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the bulk newsletter import: dedupe, validation and existing subscribers
+"""
+
+import json
+import time
+
+import pytest
+
+from app import db
+from app.models import Newsletter
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(NEWSLETTER_IMPORT_BATCH_SIZE=500)
+    with app.app_context():
+        db.session.add(Newsletter(email='existing@example.com'))
+        db.session.commit()
+    return app
+
+
+def test_csv_import_counts(app, client, admin_headers):
+    csv_body = '\n'.join([
+        'name,email',
+        'Ann,ann@example.com',
+        'Bob,bob@example.com',
+        'Ann again,ann@example.com',
+        'Old,existing@example.com',
+        'Bad,not-an-email',
+        'Empty,',
+    ])
+    response = client.post('/api/newsletter/import', data=csv_body,
+                           content_type='text/csv', headers=admin_headers)
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert (body['inserted'], body['duplicate'], body['invalid']) == (2, 2, 2)
+    with app.app_context():
+        assert Newsletter.query.count() == 3
+
+
+def test_ndjson_import_of_many_rows(app, client, admin_headers):
+    count = 20000
+    lines = [json.dumps({'email': f'guest{i}@example.com'}) for i in range(count)]
+    lines += [json.dumps(f'guest{i}@example.com') for i in range(100)]  # repeats
+    lines += ['{broken', '42']
+
+    started = time.perf_counter()
+    response = client.post('/api/newsletter/import', data='\n'.join(lines),
+                           content_type='application/x-ndjson', headers=admin_headers)
+    elapsed = time.perf_counter() - started
+
+    body = response.get_json()
+    assert (body['inserted'], body['duplicate'], body['invalid']) == (count, 100, 2)
+    assert elapsed < 10, elapsed
+    with app.app_context():
+        assert Newsletter.query.count() == count + 1
+
+
+def test_import_requires_admin(client):
+    response = client.post('/api/newsletter/import', data='a@b.com', content_type='text/csv')
+    assert response.status_code == 401
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the per-slot occupancy bitmap and its invalidation on writes
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app import db, occupancy
+from app.models import Customer, Reservation
+
+SLOT = datetime(2031, 6, 14, 19)
+
+
+def cached_tables(time_slot=SLOT):
+    mask = occupancy.slot_cache.get(time_slot)
+    if mask is None:
+        return None
+    return {n for n in range(1, occupancy.TABLE_COUNT + 1) if mask & occupancy.table_bit(n)}
+
+
+def insert_reservations(app, tables, time_slot=SLOT):
+    """Book tables behind the cache's back, as another worker would"""
+    with app.app_context():
+        customer = Customer(name='Other Worker', email='other@example.com')
+        db.session.add(customer)
+        db.session.flush()
+        db.session.execute(insert(Reservation), [
+            {'customer_id': customer.id, 'time_slot': time_slot, 'table_number': t, 'number_of_guests': 2}
+            for t in tables
+        ])
+        db.session.commit()
+
+
+def test_pick_free_table():
+    assert occupancy.pick_free_table(occupancy.ALL_TABLES) is None
+    only_free = occupancy.ALL_TABLES & ~occupancy.table_bit(17)
+    assert occupancy.pick_free_table(only_free) == 17
+    taken = occupancy.table_bit(1) | occupancy.table_bit(30)
+    picks = {occupancy.pick_free_table(taken) for _ in range(500)}
+    assert picks <= set(range(2, 30))
+    assert len(picks) > 1
+
+
+def test_stale_mask_still_books_a_free_table(app, client, book):
+    assert book(client, 0).status_code == 201
+    first = cached_tables()
+    assert len(first) == 1
+
+    # Another worker takes every table but one; this worker's mask doesn't know
+    others = [t for t in range(1, occupancy.TABLE_COUNT + 1) if t not in first][:-1]
+    insert_reservations(app, others)
+    assert cached_tables() == first
+
+    response = book(client, 1)
+    assert response.status_code == 201
+    last = response.get_json()['reservation']['table_number']
+    assert last not in first | set(others)
+    assert cached_tables() == set(range(1, occupancy.TABLE_COUNT + 1))
+
+    assert book(client, 2).status_code == 409
+
+
+def test_full_stale_mask_is_reread(app, client, book):
+    with app.app_context():
+        occupancy.slot_cache.set(SLOT, occupancy.ALL_TABLES)
+    assert book(client, 0).status_code == 201
+    assert len(cached_tables()) == 1
+
+
+def test_writes_keep_the_mask_current(app, client, book, admin_headers):
+    created = book(client, 0).get_json()['reservation']
+    table = created['table_number']
+    assert cached_tables() == {table}
+
+    moved_to = '2031-06-14T20:00:00'
+    assert client.put(f"/api/reservations/{created['id']}", json={'time_slot': moved_to},
+                      headers=admin_headers).status_code == 200
+    assert cached_tables() is None
+    with app.app_context():
+        assert occupancy.taken_mask(SLOT) == 0
+        assert occupancy.taken_mask(datetime.fromisoformat(moved_to)) == occupancy.table_bit(table)
+
+    assert client.delete(f"/api/reservations/{created['id']}", headers=admin_headers).status_code == 200
+    assert cached_tables(datetime.fromisoformat(moved_to)) == set()
+
+    again = book(client, 1).get_json()['reservation']
+    assert cached_tables() == {again['table_number']}
+    response = client.delete('/api/reservations/lookup', json={'email': 'guest1@example.com',
+                                                               'reservation_id': again['id']})
+    assert response.status_code == 200
+    assert cached_tables() == set()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
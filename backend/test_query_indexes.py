@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test that the hot reservation queries are answered from indexes
+
+Captures the SQL the endpoints actually run and checks SQLite's
+EXPLAIN QUERY PLAN for each one.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Customer
+
+
+def capture_selects(app, run):
+    """Run ``run()`` and return the SELECTs it issued as (sql, params) pairs"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            run()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def query_plan(app, statement, parameters):
+    with app.app_context(), db.engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+
+
+def plans_for(app, run, table='reservation'):
+    plans = [query_plan(app, sql, params) for sql, params in capture_selects(app, run) if f'FROM {table}' in sql]
+    assert plans, f'no queries on {table} captured'
+    for plan in plans:
+        # A bare "SCAN reservation" reads the whole table
+        assert not any(step == f'SCAN {table}' for step in plan), plan
+    return plans
+
+
+def test_table_allocation_uses_time_slot_index(app, client, book):
+    plans = plans_for(app, lambda: book(client, 1))
+    assert any('(time_slot=?)' in step for plan in plans for step in plan), plans
+
+
+def test_availability_uses_time_slot_range(app, client, book):
+    book(client, 1)
+    plans = plans_for(app, lambda: client.get('/api/reservations/availability?date=2031-06-14'))
+    assert any('USING COVERING INDEX' in step and 'time_slot>?' in step for plan in plans for step in plan), plans
+
+
+def test_admin_list_pages_by_time_slot_and_id(app, client, book, admin_headers):
+    for i in range(3):
+        book(client, i, time_slot=f'2031-06-14T{18 + i}:00:00')
+    cursor = client.get('/api/reservations/all?limit=1', headers=admin_headers).get_json()['next_cursor']
+
+    plans = plans_for(app, lambda: client.get(
+        f'/api/reservations/all?limit=1&date_from=2031-06-01&cursor={cursor}', headers=admin_headers
+    ))
+    assert any('ix_reservation_time_slot_id' in step for plan in plans for step in plan), plans
+
+
+def test_customer_reservations_use_customer_index(app, client, book):
+    book(client, 1)
+
+    def load_reservations():
+        customer = Customer.query.filter_by(email='guest1@example.com').first()
+        assert len(customer.reservations) == 1
+
+    plans = plans_for(app, load_reservations)
+    assert any('ix_reservation_customer_id' in step for plan in plans for step in plan), plans
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test per-request query counting, Server-Timing and the slow-query log
+"""
+
+import logging
+
+import pytest
+
+from app.query_stats import redact
+from app.testing import assert_max_queries
+
+
+@pytest.fixture
+def booked(client, book):
+    """Book guests 0..7 over four slots and return their reservation ids"""
+    ids = []
+    for i in range(8):
+        response = book(client, i, time_slot=f'2031-06-14T{18 + i % 4}:00:00')
+        assert response.status_code == 201
+        ids.append(response.get_json()['reservation']['id'])
+    return ids
+
+
+def test_server_timing_reports_queries(client, booked, make_app):
+    response = client.get(f'/api/reservations/lookup?email=guest1@example.com&reservation_id={booked[1]}')
+    assert response.status_code == 200
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+    assert response.headers['Server-Timing'].endswith('desc="1 queries"')
+
+    assert 'Server-Timing' not in make_app(SERVER_TIMING=False).test_client().get('/api/menu/items').headers
+
+
+def test_endpoint_query_budgets(app, client, booked, admin_headers):
+    ids, headers = booked, admin_headers
+
+    # Query counts must not grow with the number of reservations returned
+    with assert_max_queries(app, 2):
+        assert len(client.get('/api/reservations/all', headers=headers).get_json()['reservations']) == 8
+    with assert_max_queries(app, 2):
+        assert client.get('/api/reservations/export', headers=headers).get_data(as_text=True).count('\n') == 9
+    with assert_max_queries(app, 1):
+        client.get(f'/api/reservations/lookup?email=guest3@example.com&reservation_id={ids[3]}')
+    with assert_max_queries(app, 6):
+        client.delete('/api/reservations/lookup', json={'email': 'guest4@example.com', 'reservation_id': ids[4]})
+
+    with pytest.raises(AssertionError, match='queries, expected at most 0'):
+        with assert_max_queries(app, 0):
+            client.get(f'/api/reservations/lookup?email=guest3@example.com&reservation_id={ids[3]}')
+
+
+@pytest.mark.app_config(SLOW_QUERY_MS=0.000001)
+def test_slow_queries_logged_without_values(client, caplog):
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='app.query_stats'):
+        client.get('/api/reservations/lookup?email=secret@example.com&reservation_id=42')
+
+    records = [r for r in caplog.records if r.name == 'app.query_stats']
+    assert len(records) == 1
+    assert all('secret@example.com' not in r.getMessage() and '42' not in str(r.parameters) for r in records)
+    assert records[0].parameters == ['str']
+
+    assert redact({'email': 'x@example.com', 'id': 3}) == {'email': 'str', 'id': 'int'}
+    assert redact([(1, 'a'), (2, 'b')]) == '2 parameter sets'
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
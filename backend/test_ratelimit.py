@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test token-bucket rate limits on login and public signups
+"""
+
+import pytest
+
+pytestmark = pytest.mark.app_config(RATELIMIT_ENABLED=True, RATELIMIT_LOGIN='3/minute')
+
+
+def attempt_login(client, ip='203.0.113.7'):
+    return client.post('/api/admin/login', json={'username': 'admin', 'password': 'wrong'},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_login_is_limited_per_ip(client):
+    statuses = [attempt_login(client).status_code for _ in range(4)]
+    assert statuses == [401, 401, 401, 429]
+
+    limited = attempt_login(client)
+    assert limited.get_json()['error'].startswith('Too many requests')
+    assert 1 <= int(limited.headers['Retry-After']) <= 20
+
+    assert attempt_login(client, ip='198.51.100.1').status_code == 401
+
+
+@pytest.mark.app_config(RATELIMIT_NEWSLETTER='1/minute')
+def test_limits_are_per_route(client):
+    ip = {'REMOTE_ADDR': '203.0.113.8'}
+
+    assert client.post('/api/newsletter/', json={'email': 'a@example.com'}, environ_base=ip).status_code == 201
+    assert client.post('/api/newsletter/', json={'email': 'b@example.com'}, environ_base=ip).status_code == 429
+    assert attempt_login(client, ip='203.0.113.8').status_code == 401
+
+
+def test_sqlite_backend_is_shared_between_workers(make_app, tmp_path):
+    config = {
+        'RATELIMIT_ENABLED': True, 'RATELIMIT_LOGIN': '3/minute',
+        'RATELIMIT_BACKEND': 'sqlite', 'RATELIMIT_STORAGE_PATH': str(tmp_path / 'ratelimit.db'),
+    }
+    first_worker = make_app(**config).test_client()
+    assert [attempt_login(first_worker).status_code for _ in range(3)] == [401, 401, 401]
+
+    second_worker = make_app(**config).test_client()
+    assert attempt_login(second_worker).status_code == 429
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test that the read-only list endpoints return rows without loading ORM instances
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
+from app import db
+from app.models import Award, GalleryImage, MenuItem, Newsletter, Review
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        db.session.add_all([
+            GalleryImage(url='https://example.com/terrace.jpg', caption='Terrace'),
+            Award(title='Best Bistro', year='2023'),
+            Review(review='Wonderful pasta.', source='City Guide'),
+            Newsletter(email='guest@example.com', signup_date=datetime(2031, 6, 14, 19, 30, 5, 120000)),
+            Newsletter(email='walkin@example.com'),
+            MenuItem(name='Tiramisu', description='Espresso and mascarpone', price=9.5, category='Desserts'),
+        ])
+        db.session.commit()
+    return app
+
+
+def test_lists_read_columns_only(client, admin_headers):
+    loaded = []
+
+    def record_load(target, context):
+        loaded.append(type(target).__name__)
+
+    event.listen(Mapper, 'load', record_load)
+    try:
+        images = client.get('/api/gallery/images').get_json()
+        awards = client.get('/api/gallery/awards').get_json()
+        reviews = client.get('/api/gallery/reviews').get_json()
+        menu = client.get('/api/menu/items').get_json()
+        signups = client.get('/api/newsletter/all', headers=admin_headers).get_json()
+    finally:
+        event.remove(Mapper, 'load', record_load)
+
+    assert set(loaded) <= {'Admin'}  # only the token check may load a model
+    assert images == [{'id': 1, 'url': 'https://example.com/terrace.jpg', 'caption': 'Terrace'}]
+    assert awards == [{'id': 1, 'title': 'Best Bistro', 'year': '2023'}]
+    assert reviews == [{'id': 1, 'review': 'Wonderful pasta.', 'source': 'City Guide'}]
+    assert menu == {'Desserts': [{'id': 1, 'name': 'Tiramisu', 'description': 'Espresso and mascarpone', 'price': 9.5}]}
+    assert signups == [
+        {'id': 1, 'email': 'guest@example.com', 'signup_date': '2031-06-14T19:30:05.120000'},
+        {'id': 2, 'email': 'walkin@example.com', 'signup_date': None},
+    ]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
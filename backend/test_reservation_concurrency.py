@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Stress test: parallel bookings for one time slot must never share a table
+"""
+
+import threading
+from collections import Counter
+
+import pytest
+from sqlalchemy import func
+
+from app import db
+from app.models import Reservation
+
+TIME_SLOT = "2031-06-14T19:00:00"
+GUESTS = 60  # twice the number of tables
+
+
+def book_in_parallel(app, count):
+    barrier = threading.Barrier(count)
+    statuses = []
+    lock = threading.Lock()
+
+    def book(i):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post('/api/reservations/', json={
+            'time_slot': TIME_SLOT,
+            'number_of_guests': 2,
+            'customer_name': f'Guest {i}',
+            'email': f'guest{i}@example.com',
+        })
+        with lock:
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=book, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return Counter(statuses)
+
+
+def test_parallel_bookings_never_double_book(make_app, tmp_path):
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'stress.db'}")
+    statuses = book_in_parallel(app, GUESTS)
+
+    assert statuses == Counter({201: 30, 409: GUESTS - 30}), statuses
+
+    with app.app_context():
+        duplicates = db.session.query(
+            Reservation.time_slot, Reservation.table_number, func.count()
+        ).group_by(
+            Reservation.time_slot, Reservation.table_number
+        ).having(func.count() > 1).all()
+        tables = {t for (t,) in db.session.query(Reservation.table_number)}
+        db.engine.dispose()
+
+    assert duplicates == []
+    assert tables == set(range(1, 31))
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test that the streamed reservation CSV export escapes fields
+"""
+
+import csv
+import io
+
+import pytest
+
+from app.utils import iter_csv
+
+HEADER = ['id', 'customer_name', 'email', 'phone', 'time_slot', 'table_number', 'number_of_guests']
+
+
+def test_export_escapes_commas_quotes_and_newlines(client, book, admin_headers):
+    name = 'Smith, "Jo"\nJunior'
+    created = book(client, 1, customer_name=name, phone='555-0101').get_json()['reservation']
+    book(client, 2)
+
+    response = client.get('/api/reservations/export', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment;filename=reservations.csv'
+    body = response.get_data(as_text=True)
+    assert body.startswith(','.join(HEADER) + '\r\n')
+    assert body.endswith('\r\n')
+
+    rows = list(csv.reader(io.StringIO(body, newline='')))
+    assert rows[0] == HEADER
+    assert len(rows) == 3
+    assert rows[1] == [str(created['id']), name, 'guest1@example.com', '555-0101',
+                       '2031-06-14T19:00:00', str(created['table_number']), '2']
+    assert rows[2][1:4] == ['Guest 2', 'guest2@example.com', '']
+
+
+def test_iter_csv_sends_the_header_first_then_rows_in_chunks():
+    rows = [(i, f'row {i}') for i in range(5)]
+    chunks = list(iter_csv(['id', 'label'], rows, flush_every=2))
+    assert chunks[0] == 'id,label\r\n'
+    assert [chunk.count('\r\n') for chunk in chunks[1:]] == [2, 2, 1]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
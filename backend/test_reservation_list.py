@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination and the filters of the admin reservation list
+"""
+
+import pytest
+
+
+@pytest.fixture
+def booked(client, book):
+    """Nine reservations over three days, three per 7PM slot"""
+    for i in range(9):
+        day = 14 + i // 3
+        response = book(client, i, time_slot=f'2031-06-{day}T19:00:00', number_of_guests=2 + i % 3,
+                        phone=f'555-01{i:02d}')
+        assert response.status_code == 201
+    return client
+
+
+def list_all(client, headers, **params):
+    """Follow next_cursor to the end and return every page"""
+    pages = []
+    cursor = None
+    while True:
+        query = {**params, **({'cursor': cursor} if cursor else {})}
+        response = client.get('/api/reservations/all', query_string=query, headers=headers)
+        assert response.status_code == 200
+        page = response.get_json()
+        pages.append(page['reservations'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return pages
+
+
+def test_pages_cover_every_reservation_once_in_order(booked, admin_headers):
+    pages = list_all(booked, admin_headers, limit=4)
+    assert [len(p) for p in pages] == [4, 4, 1]
+    rows = [r for page in pages for r in page]
+    assert len({r['id'] for r in rows}) == 9
+    assert rows == sorted(rows, key=lambda r: (r['time_slot'], r['id']))
+
+    # An exact multiple of the page size ends without an empty trailing page
+    assert [len(p) for p in list_all(booked, admin_headers, limit=3)] == [3, 3, 3]
+
+
+def test_filters_are_applied_before_paging(booked, admin_headers):
+    def ids(**params):
+        return [r['id'] for page in list_all(booked, admin_headers, limit=2, **params) for r in page]
+
+    every = {r['id']: r for page in list_all(booked, admin_headers) for r in page}
+    assert ids(date_from='2031-06-15') == [i for i, r in every.items() if r['time_slot'] >= '2031-06-15']
+    assert ids(date_to='2031-06-14') == [i for i, r in every.items() if r['time_slot'] < '2031-06-15']
+    assert ids(date_from='2031-06-15', date_to='2031-06-15') == \
+        [i for i, r in every.items() if r['time_slot'].startswith('2031-06-15')]
+    assert ids(party_size=3) == [i for i, r in every.items() if r['number_of_guests'] == 3]
+
+    table = every[next(iter(every))]['table_number']
+    assert ids(table_number=table) == [i for i, r in every.items() if r['table_number'] == table]
+
+
+def test_search(booked, admin_headers):
+    def emails(search):
+        return [r['email'] for page in list_all(booked, admin_headers, search=search) for r in page]
+
+    assert emails('GUEST 4') == ['guest4@example.com']
+    assert emails('guest7@') == ['guest7@example.com']
+    assert emails('555-0102') == ['guest2@example.com']
+    assert emails('%') == []
+    first = list_all(booked, admin_headers, limit=1)[0][0]
+    assert first['email'] in emails(str(first['id']))
+
+
+@pytest.mark.parametrize('params, status, body', [
+    ({'date_from': '14/06/2031'}, 400, {'error': 'Invalid date format. Use YYYY-MM-DD.'}),
+    ({'date_to': 'tomorrow'}, 400, {'error': 'Invalid date format. Use YYYY-MM-DD.'}),
+    ({'cursor': 'not-a-cursor'}, 400, {'error': 'Invalid cursor.'}),
+    # A digit that int() rejects is searched as text, not as a reservation id
+    ({'search': '\u00b2'}, 200, {'reservations': [], 'next_cursor': None}),
+])
+def test_bad_parameters(client, admin_headers, params, status, body):
+    response = client.get('/api/reservations/all', query_string=params, headers=admin_headers)
+    assert response.status_code == status
+    assert response.get_json() == body
+
+
+def test_requires_admin(client):
+    assert client.get('/api/reservations/all').status_code == 401
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the shared reservation serializers and the column-tuple list path
+"""
+
+import pytest
+from sqlalchemy import event, select
+
+from app import db
+from app.models import Customer, Reservation
+from app.schemas import RESERVATION_COLUMNS, RESERVATION_FIELDS, reservation_schema, rows_to_dicts
+
+
+def book_with_phone(book, client, i):
+    return book(client, i, time_slot=f'2031-06-14T{18 + i % 4}:00:00', phone='555-0100')
+
+
+def test_single_reservation_shapes(app, client, book):
+    created = book_with_phone(book, client, 1).get_json()['reservation']
+    assert list(created) == ['id', 'customer_name', 'email', 'time_slot', 'table_number', 'number_of_guests']
+    assert created['time_slot'] == '2031-06-14T19:00:00'
+
+    found = client.get(f"/api/reservations/lookup?email=guest1@example.com&reservation_id={created['id']}").get_json()
+    assert found == {**created, 'phone': '555-0100'}
+
+    with app.app_context():
+        reservation = db.session.get(Reservation, created['id'])
+        assert reservation_schema.dump(reservation) == found
+
+
+def test_list_rows_match_schema_without_loading_instances(app, client, book, admin_headers):
+    for i in range(5):
+        assert book_with_phone(book, client, i).status_code == 201
+
+    loaded = []
+
+    def record_load(target, context):
+        loaded.append(target)
+
+    event.listen(Reservation, 'load', record_load)
+    try:
+        page = client.get('/api/reservations/all?limit=3', headers=admin_headers).get_json()
+    finally:
+        event.remove(Reservation, 'load', record_load)
+    assert loaded == []
+
+    with app.app_context():
+        expected = [reservation_schema.dump(r) for r in Reservation.query.order_by(Reservation.time_slot, Reservation.id)]
+        rows = db.session.execute(
+            select(*RESERVATION_COLUMNS).outerjoin(Customer, Reservation.customer_id == Customer.id).order_by(Reservation.id)
+        )
+        assert rows_to_dicts(rows)[0].keys() == set(RESERVATION_FIELDS)
+    assert page['reservations'] == expected[:3]
+    assert page['next_cursor']
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, '-q']))
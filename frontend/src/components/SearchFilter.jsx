@@ -1,7 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { FiSearch } from 'react-icons/fi';
 import { FaFilter, FaTimes, FaSlidersH } from 'react-icons/fa';
-import { debounce } from '../services/utils.js';
 import '../styles/SearchFilter.css';
 
 const SearchFilter = ({ 
@@ -16,13 +15,10 @@ const SearchFilter = ({
   const [activeFilters, setActiveFilters] = useState({});
   const [showFilterDropdown, setShowFilterDropdown] = useState(false);
 
-  // Debounced search function
-  const debouncedSearch = debounce((term) => {
-    onSearch(term);
-  }, 300);
-
+  // Debounced search: only report the term once typing pauses for 300ms
   useEffect(() => {
-    debouncedSearch(searchTerm);
+    const timeoutId = setTimeout(() => onSearch(searchTerm), 300);
+    return () => clearTimeout(timeoutId);
   }, [searchTerm]);
 
   const handleSearchChange = (e) => {
@@ -125,6 +121,16 @@ const SearchFilter = ({
                           </option>
                         ))}
                       </select>
+                    ) : filter.type === 'number' ? (
+                      <input
+                        type="number"
+                        min={filter.min}
+                        max={filter.max}
+                        value={activeFilters[filter.key] || ''}
+                        onChange={(e) => handleFilterChange(filter.key, e.target.value)}
+                        placeholder={`Filter by ${filter.label.toLowerCase()}`}
+                        className="filter-input"
+                      />
                     ) : filter.type === 'date' ? (
                       <input
                         type="date"
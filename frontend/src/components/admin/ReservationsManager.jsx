@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { reservationService, emailService } from '../../services/index.js';
 import { showSuccess, showError, showWarning, formatDateTime } from '../../services/utils.js';
 import Card from '../Card';
@@ -9,68 +9,76 @@ import '../../styles/Admin.css';
 
 
 
+// Today as YYYY-MM-DD in local time; the list starts at upcoming reservations
+const today = () => {
+  const now = new Date();
+  return new Date(now.getTime() - now.getTimezoneOffset() * 60000).toISOString().slice(0, 10);
+};
+
 const ReservationsManager = () => {
   const [reservations, setReservations] = useState([]);
-  const [filteredReservations, setFilteredReservations] = useState([]);
   const [loading, setLoading] = useState(true);
   const [exporting, setExporting] = useState(false);
   const [currentPage, setCurrentPage] = useState(1);
   const [itemsPerPage] = useState(10);
   const [searchTerm, setSearchTerm] = useState('');
   const [filters, setFilters] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Responses to superseded queries are dropped when a newer one was sent
+  const latestQuery = useRef(0);
+
+  // Search and filters are applied by the server, so every page already matches them
+  const queryParams = () => ({
+    search: searchTerm,
+    date_from: filters.date_from || today(),
+    date_to: filters.date_to,
+    party_size: filters.guests,
+    table_number: filters.table_number,
+  });
 
   const loadReservations = async () => {
+    const query = ++latestQuery.current;
     try {
       setLoading(true);
-      const data = await reservationService.getAllReservations();
+      const data = await reservationService.getAllReservations(queryParams());
+      if (query !== latestQuery.current) return;
       setReservations(data.reservations || []);
-      setFilteredReservations(data.reservations || []);
+      setNextCursor(data.next_cursor || null);
+      setCurrentPage(1);
     } catch (error) {
       showError('Failed to load reservations: ' + error.message);
     } finally {
-      setLoading(false);
+      if (query === latestQuery.current) setLoading(false);
     }
   };
 
-  // Filter and search reservations
-  useEffect(() => {
-    let filtered = [...reservations];
-
-    // Apply search
-    if (searchTerm) {
-      const term = searchTerm.toLowerCase();
-      filtered = filtered.filter(reservation =>
-        reservation.customer_name?.toLowerCase().includes(term) ||
-        reservation.email?.toLowerCase().includes(term) ||
-        reservation.phone?.toLowerCase().includes(term) ||
-        reservation.id?.toString().includes(term)
-      );
-    }
-
-    // Apply filters
-    if (filters.date) {
-      filtered = filtered.filter(reservation => {
-        const reservationDate = new Date(reservation.time_slot).toDateString();
-        const filterDate = new Date(filters.date).toDateString();
-        return reservationDate === filterDate;
-      });
-    }
-
-    if (filters.guests) {
-      filtered = filtered.filter(reservation =>
-        reservation.number_of_guests === parseInt(filters.guests)
-      );
+  const loadMoreReservations = async () => {
+    const query = latestQuery.current;
+    try {
+      setLoadingMore(true);
+      const data = await reservationService.getAllReservations({ ...queryParams(), cursor: nextCursor });
+      if (query !== latestQuery.current) return;
+      setReservations(prev => [...prev, ...(data.reservations || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (error) {
+      showError('Failed to load more reservations: ' + error.message);
+    } finally {
+      setLoadingMore(false);
     }
+  };
 
-    setFilteredReservations(filtered);
-    setCurrentPage(1); // Reset to first page when filtering
-  }, [reservations, searchTerm, filters]);
+  // Start again from the first page whenever the search or filters change.
+  // The search box stays mounted while loading so it keeps what was typed.
+  useEffect(() => {
+    loadReservations();
+  }, [searchTerm, filters]);
 
   // Get current page items
   const indexOfLastItem = currentPage * itemsPerPage;
   const indexOfFirstItem = indexOfLastItem - itemsPerPage;
-  const currentItems = filteredReservations.slice(indexOfFirstItem, indexOfLastItem);
-  const totalPages = Math.ceil(filteredReservations.length / itemsPerPage);
+  const currentItems = reservations.slice(indexOfFirstItem, indexOfLastItem);
+  const totalPages = Math.ceil(reservations.length / itemsPerPage);
 
   const handleSearch = (term) => {
     setSearchTerm(term);
@@ -133,21 +141,6 @@ Table Number: ${reservation.table_number}
     }
   };
 
-  useEffect(() => {
-    loadReservations();
-  }, []);
-
-  if (loading) {
-    return (
-      <div className="admin-manager-container">
-        <div className="admin-loading-message">
-          <FiRefreshCw className="admin-spin" />
-          Loading reservations...
-        </div>
-      </div>
-    );
-  }
-
   return (
     <div className="admin-manager-container">
       <div className="admin-manager-header">
@@ -172,30 +165,42 @@ Table Number: ${reservation.table_number}
           placeholder="Search reservations by name, email, phone, or ID..."
           filters={[
             {
-              key: 'date',
-              label: 'Date',
+              key: 'date_from',
+              label: 'From (default today)',
+              type: 'date'
+            },
+            {
+              key: 'date_to',
+              label: 'To',
               type: 'date'
             },
             {
               key: 'guests',
               label: 'Number of Guests',
-              type: 'select',
-              options: [
-                { value: 1, label: '1 Guest' },
-                { value: 2, label: '2 Guests' },
-                { value: 3, label: '3 Guests' },
-                { value: 4, label: '4 Guests' },
-                { value: 5, label: '5+ Guests' }
-              ]
+              type: 'number',
+              min: 1,
+              max: 20
+            },
+            {
+              key: 'table_number',
+              label: 'Table',
+              type: 'text'
             }
           ]}
         />
       </Card>
 
       <Card>
-        {filteredReservations.length === 0 ? (
+        {loading ? (
+          <div className="admin-loading-message">
+            <FiRefreshCw className="admin-spin" />
+            Loading reservations...
+          </div>
+        ) : reservations.length === 0 ? (
           <div className="admin-empty-message">
-            {reservations.length === 0 ? 'No reservations found.' : 'No reservations match your search criteria.'}
+            {searchTerm || Object.keys(filters).length > 0
+              ? 'No reservations match your search criteria.'
+              : 'No upcoming reservations.'}
           </div>
         ) : (
           <table className="admin-table">
@@ -251,6 +256,18 @@ Table Number: ${reservation.table_number}
         )}
       </Card>
 
+      {nextCursor && (
+        <Card>
+          <button
+            className="admin-btn"
+            onClick={loadMoreReservations}
+            disabled={loadingMore}
+          >
+            {loadingMore ? 'Loading...' : 'Load more reservations'}
+          </button>
+        </Card>
+      )}
+
       {/* Pagination */}
       {totalPages > 1 && (
         <Card>
@@ -258,7 +275,7 @@ Table Number: ${reservation.table_number}
             currentPage={currentPage}
             totalPages={totalPages}
             onPageChange={handlePageChange}
-            totalItems={filteredReservations.length}
+            totalItems={reservations.length}
             itemsPerPage={itemsPerPage}
           />
         </Card>
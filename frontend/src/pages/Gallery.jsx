@@ -42,11 +42,11 @@ const Gallery = () => {
     const loadGalleryData = async () => {
       try {
         setLoading(true);
-        const [imagesData, awardsData, reviewsData] = await Promise.all([
-          galleryService.getAllImages(),
-          galleryService.getAllAwards(),
-          galleryService.getAllReviews()
-        ]);
+        const {
+          images: imagesData,
+          awards: awardsData,
+          reviews: reviewsData
+        } = await galleryService.getLanding();
         
         // Use backend data if available, otherwise use static data
         if (imagesData && imagesData.length > 0) {
@@ -2,6 +2,11 @@ import apiRequest from './apiConfig.js';
 
 // Gallery Service
 export const galleryService = {
+  // Get images, awards, reviews and about info in one request
+  getLanding: async () => {
+    return apiRequest('/gallery/landing');
+  },
+
   // Get all gallery images
   getGalleryImages: async () => {
     return apiRequest('/gallery/images');
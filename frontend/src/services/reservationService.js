@@ -10,9 +10,18 @@ export const reservationService = {
     });
   },
 
-  // Get all reservations (admin only)
-  getAllReservations: async () => {
-    return apiRequest('/reservations/all');
+  // Get remaining tables for every time slot of a date
+  getAvailability: async (date) => {
+    return apiRequest(`/reservations/availability?date=${encodeURIComponent(date)}`);
+  },
+
+  // Get a page of reservations (admin only); pass `cursor` from the previous
+  // page's `next_cursor`, plus optional date_from, date_to, party_size, table_number
+  getAllReservations: async (params = {}) => {
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    ).toString();
+    return apiRequest(`/reservations/all${query ? `?${query}` : ''}`);
   },
 
   // Update a reservation (admin only)